@@ -1,79 +1,43 @@
 # AgriBot.py
-import os
-import time
-import base64
-import requests
 import streamlit as st
-import speech_recognition as sr
-from langdetect import detect
-from groq import Groq
-from dotenv import load_dotenv, find_dotenv
-import io
-from typing import List, Dict
-from gtts import gTTS
 # --- Import shared functions ---
 from utils import (
     apply_custom_css,
     t,
     get_kannada_audio_bytes, # (NEW) Import the byte generator
     language_toggle,
-    translate_to_english,
-    translate_back
+    register_pwa
 )
 # (NEW) Import the floating bot
 from project_bot import render_project_bot 
+from metrics import start_run, span, render_debug_panel
+from speech import SPEECH_BACKEND, SpeechBackendUnavailable, transcribe_stream
+from chat_pipeline import PROVIDER, MODEL, PIPELINE_MODE, answer_turn
+from state_store import session_id, load_history, append_turn, clear_history
+from runtime import env
 
 # -----------------------------
 # Page Config (GLOBAL) & CSS & PWA Headers
 # -----------------------------
 st.set_page_config(page_title="Agri-Bot", page_icon="🌱", layout="wide", initial_sidebar_state="expanded")
+start_run()
 apply_custom_css()
-st.markdown("""
-    <link rel="manifest" href="manifest.json">
-    <script>
-        if ('serviceWorker' in navigator) {
-            navigator.serviceWorker.register('service-worker.js');
-        }
-    </script>
-    """, unsafe_allow_html=True)
+register_pwa()
 
 # -----------------------------
-# Load environment variables & Groq Client
+# API key check (the LLM is called through chat_pipeline; .env is loaded once by runtime)
 # -----------------------------
-load_dotenv(find_dotenv())
-GROQ_KEY = os.getenv("GROQ_API_KEY")
-API_KEY = GROQ_KEY
-if not GROQ_KEY: st.error("GROQ_API_KEY is not set!"); st.stop()
-PROVIDER = "GROQ"; DEFAULT_BASE = "https://api.groq.com/openai/v1"; DEFAULT_MODEL = "llama-3.3-70b-versatile"
-OPENAI_API_BASE = os.getenv("OPENAI_API_BASE", DEFAULT_BASE); MODEL = os.getenv("OPENAI_MODEL", DEFAULT_MODEL)
-RETRIES = int(os.getenv("API_RETRIES", 2))
-client = Groq(api_key=GROQ_KEY)
-r = sr.Recognizer()
+if not env("GROQ_API_KEY"): st.error("GROQ_API_KEY is not set!"); st.stop()
 
 # -----------------------------
-# Session state
+# Session state (chat history restored from the shared state backend)
 # -----------------------------
-if "messages" not in st.session_state: st.session_state.messages = []
+sid = session_id()
+if "messages" not in st.session_state:
+    st.session_state.messages, st.session_state.audio_bytes_for_message = load_history(sid)
 if "last_audio_hash" not in st.session_state: st.session_state.last_audio_hash = None
 if "audio_bytes_for_message" not in st.session_state: st.session_state.audio_bytes_for_message = {}
 
-# -----------------------------
-# API Call with Chat History
-# -----------------------------
-def call_chat_api(message_history: List[Dict[str, str]], max_retries: int = RETRIES) -> str:
-    if not API_KEY: raise EnvironmentError("Missing API key in .env")
-    messages_payload = [{"role": "system", "content": "You are an expert agriculture and farming assistant for Indian farmers. Answer concisely and helpfully. If asked in Kannada, answer in Kannada."}]
-    messages_payload.extend(message_history[-10:])
-    url = OPENAI_API_BASE.rstrip("/") + "/chat/completions"
-    headers = {"Authorization": f"Bearer {API_KEY}", "Content-Type": "application/json"}
-    payload = {"model": MODEL, "messages": messages_payload, "temperature": 0.3, "max_tokens": 700}
-    for attempt in range(1, max_retries + 1):
-        try:
-            resp = requests.post(url, headers=headers, json=payload, timeout=40)
-            if resp.status_code == 200: return resp.json()["choices"][0]["message"]["content"].strip()
-        except Exception as e: last_error = str(e); time.sleep(1 * attempt)
-    raise RuntimeError(f"API failed: {last_error}")
-
 # -----------------------------
 # Title & Sidebar
 # -----------------------------
@@ -83,10 +47,13 @@ st.markdown(f"<h3 style='text-align:center;'>{t('Powered by AI', lang)}</h3>", u
 with st.sidebar:
     st.markdown(f"### {t('Settings', lang)}"); language_toggle(); st.markdown("---")
     st.markdown(f"**{t('Model', lang)}:** `{MODEL}`"); st.markdown(f"**{t('Provider', lang)}:** `{PROVIDER}`")
+    st.markdown(f"**{t('Speech', lang)}:** `{SPEECH_BACKEND}`"); st.markdown(f"**{t('Pipeline', lang)}:** `{PIPELINE_MODE}`")
     if st.button(t("Clear Chat History", lang)):
         st.session_state.messages = []; st.session_state.last_audio_hash = None
         st.session_state.audio_bytes_for_message = {}
+        clear_history(sid)
         st.rerun()
+    st.caption(t("This chat is saved under the link in your address bar. Anyone you share it with can read it.", lang))
 
 # -----------------------------
 # Chat Messages Display
@@ -118,11 +85,19 @@ if audio_bytes_obj:
     if current_audio_hash != st.session_state.last_audio_hash:
         st.session_state.last_audio_hash = current_audio_hash
         st.info(t("Processing voice input...", lang))
+        partial_box = st.empty()
         try:
-            wav_file = io.BytesIO(audio_data_bytes)
-            with sr.AudioFile(wav_file) as source: audio_data = r.record(source)
-            user_input_voice = r.recognize_google(audio_data, language="kn-IN")
-        except Exception as e:
+            with span("speech.recognize", backend=SPEECH_BACKEND, bytes=len(audio_data_bytes)):
+                for partial in transcribe_stream(audio_data_bytes, language="kn-IN"):
+                    user_input_voice = partial
+                    partial_box.caption(f"🎙️ {partial}")
+            partial_box.empty()
+            if not user_input_voice: st.error(t("No speech was detected. Please try again.", lang))
+        except SpeechBackendUnavailable as e:
+            partial_box.empty(); print(f"Speech backend error: {e}")
+            st.error(f"{t('Voice input is not configured on this server.', lang)} ({e})")
+        except Exception:
+            partial_box.empty()
             st.error(t("Sorry, I could not understand the audio.", lang))
 
 # -----------------------------
@@ -139,19 +114,19 @@ if user_input:
 
     with st.spinner(t("Thinking…", lang)):
         try:
-            eng_query, orig_lang = translate_to_english(user_input)
             history = st.session_state.messages
-            answer = call_chat_api(history)
-            final_answer = translate_back(answer, orig_lang)
+            final_answer, orig_lang = answer_turn(history)
 
             st.session_state.messages.append({"role": "assistant", "content": final_answer})
             message_counter += 1 
             assistant_msg_key = f"msg_{message_counter}"
 
+            audio_bytes = None
             if orig_lang == "kn":
                 audio_bytes = get_kannada_audio_bytes(final_answer)
                 if audio_bytes:
                     st.session_state.audio_bytes_for_message[assistant_msg_key] = audio_bytes
+            append_turn(sid, st.session_state.messages[-2:], audio_bytes)
             
             st.rerun() # Rerun to display the new message and button
 
@@ -159,4 +134,5 @@ if user_input:
             st.error(f"Error: {e}")
 
 # (NEW) Render the floating bot at the end
-render_project_bot()
\ No newline at end of file
+render_project_bot()
+render_debug_panel()
\ No newline at end of file
@@ -0,0 +1,109 @@
+# benchmarks/eval_pipeline_modes.py
+"""Compares the chat pipeline modes on a fixed question set.
+
+For every question in benchmarks/questions.json, and for each mode
+("native" and "translate"), it records:
+  - latency: wall time of the turn plus time per stage (langdetect,
+    translation hops, LLM) taken from metrics.py
+  - language match: whether the answer is in the script of the question
+    (the language the pipeline detected for the question is reported next to it)
+  - keyword coverage: fraction of expected keyword groups present
+  - judge score (optional, --judge): 1-5 rating by the LLM itself
+
+Usage:
+    python benchmarks/eval_pipeline_modes.py [--repeat 2] [--judge] [--json out.json]
+
+Needs GROQ_API_KEY; every question costs one LLM call per mode and repeat,
+plus one more per answer with --judge.
+"""
+import os
+import re
+import sys
+import json
+import time
+import argparse
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from chat_pipeline import PIPELINE_MODES, answer_turn, call_chat_api, detect_script_lang # noqa: E402
+from metrics import snapshot # noqa: E402
+
+QUESTIONS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "questions.json")
+JUDGE_PROMPT = ("You grade answers from a farming assistant for Indian farmers. Rate the answer from 1 (wrong or useless) "
+                "to 5 (correct, practical and in the same language as the question). Reply with the number only.")
+
+
+def keyword_coverage(answer, groups):
+    text = answer.lower()
+    if not groups: return 1.0
+    return sum(any(k.lower() in text for k in group) for group in groups) / len(groups)
+
+
+def judge(question, answer):
+    reply = call_chat_api([{"role": "user", "content": f"Question: {question}\n\nAnswer: {answer}"}], system_prompt=JUDGE_PROMPT)
+    match = re.search(r"[1-5]", reply)
+    return int(match.group()) if match else None
+
+
+def stage_delta(before, after):
+    return {name: after[name]["sum"] - before.get(name, {}).get("sum", 0.0) for name in after
+            if after[name]["count"] != before.get(name, {}).get("count", 0)}
+
+
+def run(questions, modes, repeat, use_judge):
+    rows = []
+    for q in questions:
+        for mode in modes:
+            for _ in range(repeat):
+                before = snapshot(); start = time.perf_counter()
+                try:
+                    answer, lang = answer_turn([{"role": "user", "content": q["text"]}], mode=mode)
+                    error = None
+                except Exception as e:
+                    answer, lang, error = "", None, str(e)
+                elapsed = time.perf_counter() - start
+                stages = stage_delta(before, snapshot())
+                row = {
+                    "id": q["id"], "mode": mode, "latency": elapsed, "stages": stages, "error": error,
+                    "detected_lang": lang, "lang_match": bool(answer) and detect_script_lang(answer) == q["lang"],
+                    "coverage": keyword_coverage(answer, q.get("keywords", [])),
+                    "answer": answer,
+                }
+                if use_judge and answer: row["judge"] = judge(q["text"], answer)
+                rows.append(row)
+                print(f"{q['id']:<24} {mode:<9} {elapsed:6.2f}s lang={lang or '-':<3} lang_ok={row['lang_match']!s:<5} "
+                      f"coverage={row['coverage']:.2f}" + (f" judge={row.get('judge')}" if use_judge else "") + (f" ERROR {error}" if error else ""))
+    return rows
+
+
+def summarize(rows, modes):
+    print("\nmode       turns  p50 s  p90 s  lang_ok  coverage  judge   translate s/turn")
+    for mode in modes:
+        rs = [r for r in rows if r["mode"] == mode and not r["error"]]
+        if not rs: print(f"{mode:<10} no successful turns"); continue
+        lat = sorted(r["latency"] for r in rs)
+        p90 = lat[min(len(lat) - 1, int(round(0.9 * (len(lat) - 1))))]
+        judged = [r["judge"] for r in rs if r.get("judge")]
+        trans = statistics.mean(sum(v for k, v in r["stages"].items() if k.startswith(("translate.", "langdetect"))) for r in rs)
+        print(f"{mode:<10} {len(rs):>5}  {statistics.median(lat):5.2f}  {p90:5.2f}  "
+              f"{sum(r['lang_match'] for r in rs) / len(rs):7.0%}  {statistics.mean(r['coverage'] for r in rs):8.2f}  "
+              f"{(statistics.mean(judged) if judged else float('nan')):5.2f}   {trans:6.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modes", nargs="+", default=list(PIPELINE_MODES), choices=PIPELINE_MODES)
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--judge", action="store_true", help="also ask the LLM to grade each answer")
+    parser.add_argument("--json", help="write per-turn results to this file")
+    args = parser.parse_args()
+
+    with open(QUESTIONS_PATH, encoding="utf-8") as f: questions = json.load(f)["questions"]
+    rows = run(questions, args.modes, args.repeat, args.judge)
+    summarize(rows, args.modes)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f: json.dump(rows, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
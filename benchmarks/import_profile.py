@@ -0,0 +1,112 @@
+# benchmarks/import_profile.py
+"""Cold-start profile: module import time and per-page script time.
+
+Each measurement runs in a fresh interpreter, so nothing is pre-imported:
+  - import: `python -X importtime -c "import <module>"`, cumulative time of
+    the module itself, median of --repeat runs
+  - page:   streamlit.testing AppTest, the first (cold) and second (warm)
+    run of each page script
+
+Usage:
+    python benchmarks/import_profile.py                # print the profile
+    python benchmarks/import_profile.py --write        # update the checked-in baseline
+    python benchmarks/import_profile.py --check 1.5    # fail if anything got >1.5x (and >20 ms) slower than baseline
+
+Pages run with a dummy GROQ_API_KEY and no weather key, in English, so they
+make no network calls. The baseline lives in benchmarks/import_profile.json;
+absolute numbers depend on the machine, so compare runs from the same host.
+"""
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "import_profile.json")
+MODULES = ["runtime", "metrics", "utils", "state_store", "speech", "chat_pipeline", "project_bot", "policy_catalog"]
+NOISE_FLOOR = 0.02 # seconds; smaller differences are run-to-run jitter, never a regression
+PAGES = ["AgriBot.py", "pages/1_Crop_Recommender.py", "pages/2_Disease_Detector.py", "pages/3_Policy_Portal.py"]
+PAGE_SNIPPET = """
+import json, time
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file({path!r}, default_timeout=120)
+t0 = time.perf_counter(); at.run(); cold = time.perf_counter() - t0
+t0 = time.perf_counter(); at.run(); warm = time.perf_counter() - t0
+print(json.dumps({{"cold": cold, "warm": warm, "exceptions": len(at.exception)}}))
+"""
+
+
+def _env():
+    return dict(os.environ, GROQ_API_KEY=os.environ.get("GROQ_API_KEY", "profile-dummy"), OPENWEATHER_API_KEY="", PYTHONDONTWRITEBYTECODE="")
+
+
+def import_time(module, repeat):
+    """Cumulative import time of one module in seconds (median)."""
+    times = []
+    for _ in range(repeat):
+        proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"], cwd=ROOT_DIR, env=_env(),
+                              capture_output=True, text=True)
+        for line in proc.stderr.splitlines():
+            parts = [p.strip() for p in line.replace("import time:", "").split("|")]
+            if len(parts) == 3 and parts[2] == module:
+                times.append(int(parts[1]) / 1e6)
+    return statistics.median(times) if times else None
+
+
+def page_time(path):
+    proc = subprocess.run([sys.executable, "-c", PAGE_SNIPPET.format(path=path)], cwd=ROOT_DIR, env=_env(),
+                          capture_output=True, text=True)
+    try:
+        return json.loads(proc.stdout.strip().splitlines()[-1])
+    except (IndexError, ValueError):
+        return {"error": proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "no output"}
+
+
+def profile(repeat):
+    result = {"python": sys.version.split()[0], "imports": {}, "pages": {}}
+    for module in MODULES:
+        result["imports"][module] = import_time(module, repeat)
+        print(f"import {module:<16} {result['imports'][module] or float('nan'):7.3f}s")
+    for path in PAGES:
+        result["pages"][path] = page_time(path)
+        p = result["pages"][path]
+        if "error" in p: print(f"page   {path:<30} error: {p['error']}")
+        else: print(f"page   {path:<30} cold {p['cold']:6.3f}s  warm {p['warm']:6.3f}s  exceptions {p['exceptions']}")
+    return result
+
+
+def check(result, baseline, factor):
+    failures = []
+    for module, t in result["imports"].items():
+        base = baseline["imports"].get(module)
+        if t and base and t > base * factor and t - base > NOISE_FLOOR: failures.append(f"import {module}: {t:.3f}s > {factor}x {base:.3f}s")
+    for path, p in result["pages"].items():
+        base = baseline["pages"].get(path, {})
+        for key in ("cold", "warm"):
+            if key in p and key in base and p[key] > base[key] * factor and p[key] - base[key] > NOISE_FLOOR:
+                failures.append(f"page {path} {key}: {p[key]:.3f}s > {factor}x {base[key]:.3f}s")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--write", action="store_true", help=f"store the result as the baseline ({os.path.basename(BASELINE_PATH)})")
+    parser.add_argument("--check", type=float, metavar="FACTOR", help="exit non-zero if any number exceeds FACTOR x baseline")
+    args = parser.parse_args()
+
+    result = profile(args.repeat)
+    if args.write:
+        with open(BASELINE_PATH, "w", encoding="utf-8") as f: json.dump(result, f, indent=2); f.write("\n")
+        print(f"wrote {BASELINE_PATH}")
+    if args.check:
+        with open(BASELINE_PATH, encoding="utf-8") as f: baseline = json.load(f)
+        failures = check(result, baseline, args.check)
+        for failure in failures: print(f"REGRESSION {failure}")
+        sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,479 @@
+# benchmarks/load_test.py
+"""Concurrent-session load test for the Agri-Bot Streamlit app.
+
+Opens N simulated browser sessions over Streamlit's websocket protocol
+against a locally running instance and replays a weighted mix of user
+actions:
+
+  chat       send a question through the main page's chat input
+  recommend  pick state/district, save the location, get crop recommendations
+  upload     upload a leaf image to the Disease Detector
+  policy     search the Policy Portal and open a scheme's details
+
+N is ramped through --sessions. Each level reports throughput, latency
+percentiles per action, errors, and the CPU and RSS of the server process.
+
+By default the harness starts its own stubbed environment: a local fake
+LLM endpoint (OpenAI/Groq compatible, with --llm-latency seconds of delay)
+and `streamlit run AgriBot.py` pointed at it, with no weather key and a stub
+disease model that blocks --predict-latency seconds per prediction (a fake
+`tensorflow` package put first on the server's PYTHONPATH). It uses the English UI, so no translation or TTS
+traffic leaves the machine. An action counts as failed when it raises, or
+when the page shows an exception or an st.error alert. Use
+--url to target an instance you started yourself (with
+--server.enableXsrfProtection=false), plus --pid to sample its resources.
+
+Usage:
+    python benchmarks/load_test.py --sessions 1 5 10 25 --duration 60
+    python benchmarks/load_test.py --mix chat=1 --sessions 1 2 4 8 16 --json out.json
+
+Requires the `websockets` package (a dependency of recent Streamlit releases).
+"""
+import os
+import sys
+import json
+import time
+import uuid
+import atexit
+import random
+import shutil
+import socket
+import asyncio
+import argparse
+import threading
+import statistics
+import subprocess
+import tempfile
+from io import BytesIO
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+import websockets
+from streamlit.proto.Alert_pb2 import Alert
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.Selectbox_pb2 import Selectbox
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_MIX = "chat=50,recommend=20,upload=15,policy=15"
+CHAT_QUESTIONS = [
+    "How do I control leaf blast in paddy?", "When should I sow ragi in Karnataka?",
+    "What fertilizer is best for groundnut?", "How much water does sugarcane need?",
+    "How do I make compost quickly?", "Which crops grow well in red soil?",
+]
+POLICY_KEYWORDS = ["organic", "free", "machinery", "livestock", "subsidy", "kisan", ""]
+FINISHED_EARLY = ForwardMsg.ScriptFinishedStatus.Value("FINISHED_EARLY_FOR_RERUN")
+SELECTBOX_BY_STRING = "raw_value" in Selectbox.DESCRIPTOR.fields_by_name # newer Streamlit sends option text
+CHAT_INPUT_FIELD = "chat_input_value" if "chat_input_value" in WidgetState.DESCRIPTOR.fields_by_name else "string_trigger_value"
+
+
+# ----------------- Stubbed LLM -----------------
+class _StubLLMHandler(BaseHTTPRequestHandler):
+    latency = 0.5
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        prompt = (body.get("messages") or [{}])[-1].get("content", "")
+        if "Recommend 3 crops" in prompt:
+            content = "1. Rice - Suits the rainfall\n2. Maize - Good for this soil\n3. Ragi - Drought tolerant"
+        elif "cure & prevention" in prompt:
+            content = "• Remove infected leaves\n• Spray recommended fungicide\n• Avoid excess nitrogen\n• Use resistant seed"
+        else:
+            content = "Stub answer: " + " ".join(["Use good seed, balanced fertilizer and timely irrigation."] * 4)
+        time.sleep(self.latency)
+        out = json.dumps({
+            "id": "chatcmpl-stub", "object": "chat.completion", "created": int(time.time()), "model": body.get("model", "stub"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": 10, "completion_tokens": 10, "total_tokens": 20},
+        }).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(out)))
+        self.end_headers()
+        self.wfile.write(out)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_stub_llm(latency):
+    _StubLLMHandler.latency = latency
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubLLMHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0)); return s.getsockname()[1]
+
+
+# Shadows tensorflow on the server only: tf.keras.models.load_model returns a model with the
+# InceptionV3 heads' output shapes and a fixed "Leaf Blast" result, so the page runs unchanged.
+STUB_TENSORFLOW = '''"""Load-test stand-in for tensorflow (written by benchmarks/load_test.py)."""
+import os
+import time
+import types
+
+import numpy as np
+
+
+class StubModel:
+    def __init__(self, latency):
+        self.latency = latency
+
+    def predict(self, img_array):
+        time.sleep(self.latency)
+        return [np.array([[0.05, 0.05, 0.85, 0.05]]), np.array([[4.5]])]
+
+
+def _load_model(path, custom_objects=None, **kwargs):
+    return StubModel(float(os.environ.get("STUB_PREDICT_LATENCY", "0.3")))
+
+
+keras = types.SimpleNamespace(
+    models=types.SimpleNamespace(load_model=_load_model),
+    losses=types.SimpleNamespace(MeanSquaredError=lambda: "mse"),
+)
+'''
+
+
+def _stub_model_dir():
+    """Temp dir holding the fake tensorflow package and an empty model file for the page's path check."""
+    stub_dir = tempfile.mkdtemp(prefix="agribot_load_")
+    atexit.register(shutil.rmtree, stub_dir, True)
+    os.makedirs(os.path.join(stub_dir, "tensorflow"))
+    with open(os.path.join(stub_dir, "tensorflow", "__init__.py"), "w", encoding="utf-8") as f: f.write(STUB_TENSORFLOW)
+    open(os.path.join(stub_dir, "stub_model.h5"), "wb").close()
+    return stub_dir
+
+
+def start_app(stub_url, predict_latency):
+    port = _free_port()
+    stub_dir = _stub_model_dir()
+    pythonpath = os.pathsep.join(filter(None, [stub_dir, os.environ.get("PYTHONPATH")]))
+    env = dict(os.environ, GROQ_API_KEY="stub", GROQ_BASE_URL=stub_url, OPENAI_API_BASE=f"{stub_url}/openai/v1",
+               OPENWEATHER_API_KEY="", CHAT_PIPELINE_MODE="native", PYTHONPATH=pythonpath,
+               DISEASE_MODEL_PATH=os.path.join(stub_dir, "stub_model.h5"), STUB_PREDICT_LATENCY=str(predict_latency))
+    cmd = [sys.executable, "-m", "streamlit", "run", "AgriBot.py", "--server.port", str(port), "--server.headless", "true",
+           "--server.enableXsrfProtection", "false", "--browser.gatherUsageStats", "false"]
+    proc = subprocess.Popen(cmd, cwd=ROOT_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    url = f"http://127.0.0.1:{port}"
+    for _ in range(120):
+        try:
+            if requests.get(url + "/_stcore/health", timeout=1).ok: return proc, url
+        except requests.RequestException:
+            pass
+        if proc.poll() is not None: break
+        time.sleep(0.5)
+    proc.kill()
+    raise RuntimeError("Streamlit did not become healthy")
+
+
+# ----------------- Resource Sampling -----------------
+class ProcSampler:
+    """Samples CPU% and RSS of a process (and its children, when psutil is available)."""
+
+    def __init__(self, pid, interval=0.5):
+        self.pid, self.interval = pid, interval
+        self.samples = []
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _read(self):
+        try:
+            import psutil
+            procs = [psutil.Process(self.pid)]
+            procs += procs[0].children(recursive=True)
+            cpu = sum(p.cpu_times().user + p.cpu_times().system for p in procs)
+            return cpu, sum(p.memory_info().rss for p in procs)
+        except ImportError:
+            with open(f"/proc/{self.pid}/stat") as f: fields = f.read().rsplit(")", 1)[1].split()
+            cpu = (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+            with open(f"/proc/{self.pid}/status") as f:
+                rss = next(int(line.split()[1]) * 1024 for line in f if line.startswith("VmRSS"))
+            return cpu, rss
+
+    def _run(self):
+        last_cpu, last_t = self._read()[0], time.monotonic()
+        while not self._stop.wait(self.interval):
+            cpu, rss = self._read(); now = time.monotonic()
+            self.samples.append(((cpu - last_cpu) / (now - last_t) * 100, rss))
+            last_cpu, last_t = cpu, now
+
+    def start(self):
+        self.samples = []; self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True); self._thread.start()
+
+    def stop(self):
+        self._stop.set(); self._thread.join()
+        if not self.samples: return {}
+        cpus, rss = [s[0] for s in self.samples], [s[1] for s in self.samples]
+        return {"cpu_avg": statistics.mean(cpus), "cpu_max": max(cpus), "rss_max_mb": max(rss) / 2**20}
+
+
+# ----------------- Simulated Browser Session -----------------
+class Session:
+    """One websocket session: tracks widgets by label and replays user actions as reruns."""
+
+    def __init__(self, url, timeout):
+        self.url, self.timeout = url, timeout
+        self.ws = None
+        self.session_id = None
+        self.pages = {}       # page_name -> page_script_hash
+        self.page = ""        # current page name ("" = main)
+        self.widgets = {}     # (kind, label) -> [element proto, ...] for the current page
+        self.values = {}      # widget id -> WidgetState persisted across reruns
+        self.errors = 0
+        self.last_error = None
+        self._finished = None
+        self._file_urls = {}
+
+    async def connect(self):
+        ws_url = self.url.replace("http", "ws", 1) + "/_stcore/stream"
+        self.ws = await websockets.connect(ws_url, subprotocols=["streamlit"], max_size=None)
+        self._reader = asyncio.create_task(self._read_loop())
+
+    async def close(self):
+        self._reader.cancel()
+        await self.ws.close()
+
+    def _on_element(self, element):
+        kind = element.WhichOneof("type")
+        if kind in ("button", "chat_input", "selectbox", "text_input", "file_uploader", "multiselect"):
+            widget = getattr(element, kind)
+            label = widget.placeholder if kind == "chat_input" else widget.label
+            self.widgets.setdefault((kind, label), []).append(widget)
+        elif kind == "exception":
+            self.errors += 1; self.last_error = f"exception: {element.exception.message}"
+        elif kind == "alert" and element.alert.format == Alert.ERROR:
+            self.errors += 1; self.last_error = f"st.error: {element.alert.body}"
+
+    async def _read_loop(self):
+        async for raw in self.ws:
+            msg = ForwardMsg(); msg.ParseFromString(raw)
+            kind = msg.WhichOneof("type")
+            if kind == "new_session":
+                self.session_id = msg.new_session.initialize.session_id or self.session_id
+                for p in getattr(msg.new_session, "app_pages", []): self.pages[p.page_name] = p.page_script_hash
+            elif kind == "navigation":
+                for p in msg.navigation.app_pages: self.pages[p.page_name] = p.page_script_hash
+            elif kind == "delta" and msg.delta.WhichOneof("type") == "new_element":
+                self._on_element(msg.delta.new_element)
+            elif kind == "file_urls_response":
+                fut = self._file_urls.pop(msg.file_urls_response.response_id, None)
+                if fut and not fut.done(): fut.set_result(msg.file_urls_response)
+            elif kind == "script_finished" and msg.script_finished != FINISHED_EARLY:
+                if self._finished and not self._finished.done(): self._finished.set_result(msg.script_finished)
+
+    async def rerun(self, page=None, triggers=()):
+        """Sends one rerun with the persisted widget values plus one-shot triggers; waits for the final finish."""
+        if page is not None and page != self.page:
+            self.page = page; self.widgets = {}; self.values = {}
+        else:
+            self.widgets = {}
+        back = BackMsg()
+        state = back.rerun_script
+        state.query_string = ""
+        state.page_name = self.page
+        state.page_script_hash = self.pages.get(self.page, "")
+        for ws in list(self.values.values()) + list(triggers):
+            state.widget_states.widgets.add().CopyFrom(ws)
+        self._finished = asyncio.get_running_loop().create_future()
+        start = time.perf_counter()
+        await self.ws.send(back.SerializeToString())
+        await asyncio.wait_for(self._finished, self.timeout)
+        return time.perf_counter() - start
+
+    # ----- widget helpers -----
+    def find(self, kind, label=None):
+        for (k, lbl), widgets in self.widgets.items():
+            if k == kind and (label is None or lbl == label): return widgets[0]
+        raise LookupError(f"{kind} {label!r} not on page {self.page or 'main'}")
+
+    def set_select(self, label, option):
+        box = self.find("selectbox", label)
+        ws = WidgetState(id=box.id)
+        if SELECTBOX_BY_STRING: ws.string_value = option
+        else: ws.int_value = list(box.options).index(option)
+        self.values[box.id] = ws
+
+    def set_text(self, label, text):
+        box = self.find("text_input", label)
+        self.values[box.id] = WidgetState(id=box.id, string_value=text)
+
+    def click(self, label):
+        return WidgetState(id=self.find("button", label).id, trigger_value=True)
+
+    def chat(self, text):
+        ws = WidgetState(id=self.find("chat_input").id)
+        getattr(ws, CHAT_INPUT_FIELD).data = text
+        return ws
+
+    async def upload(self, label, name, data, mime):
+        uploader = self.find("file_uploader", label)
+        back = BackMsg()
+        req = back.file_urls_request
+        req.request_id = uuid.uuid4().hex; req.session_id = self.session_id; req.file_names.append(name)
+        fut = asyncio.get_running_loop().create_future(); self._file_urls[req.request_id] = fut
+        await self.ws.send(back.SerializeToString())
+        resp = await asyncio.wait_for(fut, self.timeout)
+        if resp.error_msg: raise RuntimeError(resp.error_msg)
+        file_urls = resp.file_urls[0]
+        upload_url = file_urls.upload_url if file_urls.upload_url.startswith("http") else self.url + file_urls.upload_url
+        r = await asyncio.to_thread(requests.put, upload_url, files={"file": (name, data, mime)}, timeout=self.timeout)
+        r.raise_for_status()
+        ws = WidgetState(id=uploader.id)
+        info = ws.file_uploader_state_value.uploaded_file_info.add()
+        info.file_id = file_urls.file_id; info.name = name; info.size = len(data)
+        info.file_urls.CopyFrom(file_urls)
+        self.values[uploader.id] = ws
+
+
+# ----------------- Actions -----------------
+def _leaf_image():
+    from PIL import Image
+    buf = BytesIO()
+    Image.new("RGB", (320, 240), (70, 130, 50)).save(buf, "JPEG", quality=80)
+    return buf.getvalue()
+
+LEAF_JPEG = None
+
+
+async def action_chat(s):
+    if s.page != "": await s.rerun(page="")
+    return await s.rerun(triggers=[s.chat(random.choice(CHAT_QUESTIONS))])
+
+
+async def action_recommend(s):
+    if s.page != "Crop_Recommender": await s.rerun(page="Crop_Recommender")
+    s.set_select("State", "Karnataka"); await s.rerun()
+    s.set_select("District", random.choice(["Mandya", "Mysuru", "Hassan", "Tumakuru"]))
+    await s.rerun(triggers=[s.click("Save Location")])
+    return await s.rerun(triggers=[s.click("Get Crop Recommendations")])
+
+
+async def action_upload(s):
+    global LEAF_JPEG
+    LEAF_JPEG = LEAF_JPEG or _leaf_image()
+    if s.page != "Disease_Detector": await s.rerun(page="Disease_Detector")
+    start = time.perf_counter()
+    await s.upload("Upload Paddy Leaf Image", "leaf.jpg", LEAF_JPEG, "image/jpeg")
+    await s.rerun()
+    return time.perf_counter() - start
+
+
+async def action_policy(s):
+    if s.page != "Policy_Portal": await s.rerun(page="Policy_Portal")
+    s.set_text("Search schemes", random.choice(POLICY_KEYWORDS))
+    elapsed = await s.rerun()
+    try:
+        elapsed += await s.rerun(triggers=[s.click("Show Details")])
+    except LookupError:
+        pass # no scheme matched the keyword
+    return elapsed
+
+
+ACTIONS = {"chat": action_chat, "recommend": action_recommend, "upload": action_upload, "policy": action_policy}
+
+
+# ----------------- Driver -----------------
+async def session_worker(url, deadline, mix, think, timeout, results):
+    s = Session(url, timeout)
+    try:
+        await s.connect()
+        await s.rerun(page="")
+    except Exception as e:
+        results.append(("connect", None, repr(e))); return
+    names, weights = zip(*mix.items())
+    while time.monotonic() < deadline:
+        name = random.choices(names, weights)[0]
+        errors_before = s.errors
+        try:
+            latency = await ACTIONS[name](s)
+            results.append((name, latency, s.last_error if s.errors > errors_before else None))
+        except Exception as e:
+            results.append((name, None, repr(e)))
+        await asyncio.sleep(random.expovariate(1 / think) if think > 0 else 0)
+    await s.close()
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(q * (len(values) - 1))))]
+
+
+async def run_level(url, n, duration, mix, think, timeout, sampler):
+    results = []
+    if sampler: sampler.start()
+    start = time.monotonic()
+    await asyncio.gather(*(session_worker(url, start + duration, mix, think, timeout, results) for _ in range(n)))
+    wall = time.monotonic() - start
+    res = sampler.stop() if sampler else {}
+    level = {"sessions": n, "wall_s": wall, "actions": {}, **res}
+    ok = [r for r in results if r[2] is None]
+    level["throughput"] = len(ok) / wall
+    level["errors"] = len(results) - len(ok)
+    for name in sorted({r[0] for r in results}):
+        lat = [r[1] for r in ok if r[0] == name]
+        level["actions"][name] = {"count": len(lat), "errors": sum(1 for r in results if r[0] == name and r[2]),
+                                  **({"p50": percentile(lat, 0.5), "p90": percentile(lat, 0.9), "p99": percentile(lat, 0.99)} if lat else {})}
+    level["sample_errors"] = sorted({r[2] for r in results if r[2]})[:5]
+    return level
+
+
+def print_level(level):
+    cpu = f"cpu avg {level['cpu_avg']:.0f}% max {level['cpu_max']:.0f}% rss {level['rss_max_mb']:.0f} MB" if "cpu_avg" in level else "cpu/rss n/a"
+    print(f"\nN={level['sessions']:<4} {level['throughput']:.2f} actions/s  errors={level['errors']}  {cpu}")
+    for name, a in level["actions"].items():
+        lat = f"p50 {a['p50']:.2f}s  p90 {a['p90']:.2f}s  p99 {a['p99']:.2f}s" if "p50" in a else "no successful runs"
+        print(f"   {name:<10} n={a['count']:<5} err={a['errors']:<4} {lat}")
+    for err in level["sample_errors"]: print(f"   ! {err}")
+
+
+def parse_mix(text):
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        if name not in ACTIONS: raise SystemExit(f"unknown action {name!r}; choose from {', '.join(ACTIONS)}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", nargs="+", type=int, default=[1, 5, 10, 25])
+    parser.add_argument("--duration", type=float, default=60, help="seconds per level")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"weighted actions (default {DEFAULT_MIX})")
+    parser.add_argument("--think", type=float, default=2.0, help="mean think time between actions, seconds")
+    parser.add_argument("--timeout", type=float, default=120, help="per-rerun timeout, seconds")
+    parser.add_argument("--llm-latency", type=float, default=0.5, help="stub LLM response delay, seconds")
+    parser.add_argument("--predict-latency", type=float, default=0.3, help="stub disease model time per prediction, seconds")
+    parser.add_argument("--url", help="target an already running instance instead of starting one")
+    parser.add_argument("--pid", type=int, help="server pid to sample with --url")
+    parser.add_argument("--json", help="write per-level results to this file")
+    args = parser.parse_args()
+
+    mix = parse_mix(args.mix)
+    proc = None
+    if args.url:
+        url, pid = args.url.rstrip("/"), args.pid
+    else:
+        proc, url = start_app(start_stub_llm(args.llm_latency), args.predict_latency)
+        pid = proc.pid
+        print(f"started {url} (pid {pid})")
+    sampler = ProcSampler(pid) if pid else None
+    levels = []
+    try:
+        for n in args.sessions:
+            level = asyncio.run(run_level(url, n, args.duration, mix, args.think, args.timeout, sampler))
+            print_level(level); levels.append(level)
+    finally:
+        if proc: proc.terminate(); proc.wait(10)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f: json.dump(levels, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
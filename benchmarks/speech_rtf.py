@@ -0,0 +1,64 @@
+# benchmarks/speech_rtf.py
+"""Real-time factor (processing time / audio duration) of the speech backends.
+
+Usage:
+    python benchmarks/speech_rtf.py clip1.wav clip2.wav --backends google whisper
+
+RTF < 1.0 means faster than real time. For whisper the time to the first
+partial result is reported too; the model load is timed separately so it
+does not skew the per-clip numbers.
+"""
+import os
+import sys
+import time
+import wave
+import argparse
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from speech import transcribe_stream, load_whisper_model # noqa: E402
+
+
+def wav_duration(path):
+    with wave.open(path, "rb") as w: return w.getnframes() / float(w.getframerate())
+
+
+def run_clip(path, backend, language):
+    with open(path, "rb") as f: audio = f.read()
+    start = time.perf_counter(); first = None; text = ""
+    for text in transcribe_stream(audio, language=language, backend=backend):
+        if first is None: first = time.perf_counter() - start
+    elapsed = time.perf_counter() - start
+    return elapsed, first if first is not None else elapsed, text
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("wavs", nargs="+", help="PCM WAV clips (e.g. Kannada farmer questions)")
+    parser.add_argument("--backends", nargs="+", default=["google", "whisper"])
+    parser.add_argument("--language", default="kn-IN")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    for backend in args.backends:
+        if backend == "whisper":
+            start = time.perf_counter(); load_whisper_model()
+            print(f"[whisper] model load: {time.perf_counter() - start:.2f}s")
+        rtfs, firsts = [], []
+        for path in args.wavs:
+            duration = wav_duration(path)
+            for _ in range(args.repeat):
+                try:
+                    elapsed, first, text = run_clip(path, backend, args.language)
+                except Exception as e:
+                    print(f"[{backend}] {os.path.basename(path)}: error {e}"); break
+                rtfs.append(elapsed / duration); firsts.append(first)
+            else:
+                print(f"[{backend}] {os.path.basename(path)} ({duration:.1f}s): {text[:60]!r}")
+        if rtfs:
+            print(f"[{backend}] RTF median={statistics.median(rtfs):.3f} max={max(rtfs):.3f} | "
+                  f"first partial median={statistics.median(firsts):.2f}s over {len(rtfs)} runs\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+# chat_pipeline.py
+import re
+import time
+from typing import List, Dict, Tuple
+
+import requests
+
+from metrics import span, traced
+from runtime import env, env_int, DEFAULT_GROQ_MODEL
+from utils import translate_to_english, translate_back
+
+# -----------------------------
+# Config
+# -----------------------------
+API_KEY = env("GROQ_API_KEY")
+PROVIDER = "GROQ"; DEFAULT_BASE = "https://api.groq.com/openai/v1"; DEFAULT_MODEL = DEFAULT_GROQ_MODEL
+OPENAI_API_BASE = env("OPENAI_API_BASE", DEFAULT_BASE); MODEL = env("OPENAI_MODEL", DEFAULT_MODEL)
+RETRIES = env_int("API_RETRIES", 2)
+# "native": prompt the LLM in the user's language (no translation hops)
+# "translate": detect + kn->en translate, LLM, then en->kn back-translation (the original pipeline)
+PIPELINE_MODE = env("CHAT_PIPELINE_MODE", "native").lower()
+PIPELINE_MODES = ("native", "translate")
+
+SYSTEM_PROMPT = "You are an expert agriculture and farming assistant for Indian farmers. Answer concisely and helpfully. If asked in Kannada, answer in Kannada."
+NATIVE_KANNADA_HINT = " The farmer is writing in Kannada: reply only in Kannada script, using simple words a farmer would use."
+
+_KANNADA_CHARS = re.compile(r"[ಀ-೿]")
+
+
+def detect_script_lang(text: str) -> str:
+    """Local, zero-latency language guess: any Kannada-script character means Kannada."""
+    return "kn" if _KANNADA_CHARS.search(text or "") else "en"
+
+
+# -----------------------------
+# API Call with Chat History
+# -----------------------------
+@traced("llm.chat")
+def call_chat_api(message_history: List[Dict[str, str]], max_retries: int = RETRIES, system_prompt: str = SYSTEM_PROMPT) -> str:
+    if not API_KEY: raise EnvironmentError("Missing API key in .env")
+    messages_payload = [{"role": "system", "content": system_prompt}]
+    messages_payload.extend(message_history[-10:])
+    url = OPENAI_API_BASE.rstrip("/") + "/chat/completions"
+    headers = {"Authorization": f"Bearer {API_KEY}", "Content-Type": "application/json"}
+    payload = {"model": MODEL, "messages": messages_payload, "temperature": 0.3, "max_tokens": 700}
+    last_error = None
+    for attempt in range(1, max_retries + 1):
+        try:
+            resp = requests.post(url, headers=headers, json=payload, timeout=40)
+            if resp.status_code == 200: return resp.json()["choices"][0]["message"]["content"].strip()
+            last_error = f"HTTP {resp.status_code}"
+        except Exception as e: last_error = str(e); time.sleep(1 * attempt)
+    raise RuntimeError(f"API failed: {last_error}")
+
+
+# -----------------------------
+# One Chat Turn
+# -----------------------------
+def answer_turn(message_history: List[Dict[str, str]], mode: str = None) -> Tuple[str, str]:
+    """Answers the last user message in the history. Returns (answer, user_lang)."""
+    mode = (mode or PIPELINE_MODE).lower()
+    user_text = message_history[-1]["content"]
+    with span("chat.turn", mode=mode):
+        if mode == "native":
+            lang = detect_script_lang(user_text)
+            prompt = SYSTEM_PROMPT + (NATIVE_KANNADA_HINT if lang == "kn" else "")
+            return call_chat_api(message_history, system_prompt=prompt), lang
+        if mode == "translate":
+            _eng_query, lang = translate_to_english(user_text)
+            answer = call_chat_api(message_history)
+            return translate_back(answer, lang), lang
+        raise ValueError(f"Unknown CHAT_PIPELINE_MODE: {mode}")
@@ -0,0 +1,284 @@
+# metrics.py
+import json
+import time
+import uuid
+import threading
+import functools
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import streamlit as st
+
+from runtime import env, env_int
+
+# ----------------- Config -----------------
+DEBUG_PANEL = env("AGRIBOT_DEBUG", "0") == "1"
+SERVICE_NAME = "agribot"
+# >0 serves the Prometheus text export at http://<host>:<port>/metrics from each replica
+# (give every replica on a host its own port; Prometheus adds the instance label)
+METRICS_PORT = env_int("METRICS_PORT", 0)
+
+# ----------------- Process-wide Aggregates -----------------
+# name -> {"count", "sum", "max", "cache_hits", "cache_misses", "bytes", "errors"}
+_totals = {}
+_lock = threading.Lock()
+_local = threading.local()
+
+
+def _payload_size(value):
+    if value is None: return None
+    if isinstance(value, (bytes, bytearray)): return len(value)
+    if isinstance(value, str): return len(value.encode("utf-8"))
+    if isinstance(value, (tuple, list)): return sum(_payload_size(v) or 0 for v in value)
+    return None
+
+
+def _run_spans():
+    """Returns the span list of the current rerun, or None outside a script thread."""
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+        if get_script_run_ctx() is None: return None
+        if "_trace_current" not in st.session_state: st.session_state._trace_current = []
+        return st.session_state._trace_current
+    except Exception:
+        return None
+
+
+class Span:
+    """One timed stage: name, start/end, parent and free-form attributes."""
+
+    def __init__(self, name, parent=None):
+        self.name = name
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent.span_id if parent else None
+        self.depth = parent.depth + 1 if parent else 0
+        self.start = time.time()
+        self.end = None
+        self.attrs = {}
+        self.error = None
+
+    @property
+    def duration(self):
+        return (self.end or time.time()) - self.start
+
+    def set(self, key, value):
+        self.attrs[key] = value
+
+    def cache_miss(self):
+        self.attrs["cache_hit"] = False
+
+    def payload(self, value):
+        size = _payload_size(value)
+        if size is not None: self.attrs["bytes"] = size
+
+
+def _record(span):
+    with _lock:
+        tot = _totals.setdefault(span.name, {"count": 0, "sum": 0.0, "max": 0.0, "cache_hits": 0, "cache_misses": 0, "bytes": 0, "errors": 0})
+        tot["count"] += 1
+        tot["sum"] += span.duration
+        tot["max"] = max(tot["max"], span.duration)
+        tot["bytes"] += span.attrs.get("bytes", 0)
+        if span.error: tot["errors"] += 1
+        if "cache_hit" in span.attrs:
+            tot["cache_hits" if span.attrs["cache_hit"] else "cache_misses"] += 1
+
+
+# ----------------- Public API -----------------
+def start_run():
+    """Call once at the top of each page: keeps the previous rerun's spans for the debug panel."""
+    start_metrics_server()
+    try:
+        st.session_state._trace_last = st.session_state.get("_trace_current", [])
+        st.session_state._trace_current = []
+        st.session_state._trace_run_start = time.time()
+    except Exception:
+        pass
+
+
+@contextmanager
+def span(name, cached=False, **attrs):
+    """Times the enclosed block. With cached=True the span counts as a cache hit
+    unless the cached function body calls mark_cache_miss()."""
+    stack = getattr(_local, "stack", None)
+    if stack is None: stack = _local.stack = []
+    s = Span(name, stack[-1] if stack else None)
+    s.attrs.update(attrs)
+    if cached: s.attrs["cache_hit"] = True
+    stack.append(s)
+    try:
+        yield s
+    except BaseException as e:
+        # st.rerun()/st.stop() raise control-flow exceptions; only count real failures
+        if isinstance(e, Exception) and type(e).__module__.split(".")[0] != "streamlit": s.error = repr(e)
+        raise
+    finally:
+        s.end = time.time()
+        stack.pop()
+        _record(s)
+        spans = _run_spans()
+        if spans is not None: spans.append(s)
+
+
+def current_span():
+    """Innermost open span on this thread, or None."""
+    stack = getattr(_local, "stack", None)
+    return stack[-1] if stack else None
+
+
+@contextmanager
+def child_spans_of(parent):
+    """Spans opened on this (worker) thread inside the block become children of parent,
+    a span opened on another thread."""
+    stack = getattr(_local, "stack", None)
+    if stack is None: stack = _local.stack = []
+    if parent is not None: stack.append(parent)
+    try:
+        yield
+    finally:
+        if parent is not None: stack.pop()
+
+
+def mark_cache_miss():
+    """Flags the innermost open span as a cache miss (call inside a cached function body)."""
+    stack = getattr(_local, "stack", None)
+    if stack: stack[-1].cache_miss()
+
+
+def traced(name=None, cached=False):
+    """Decorator form of span(); records the size of the return value as payload bytes."""
+    def decorator(func):
+        span_name = name or func.__name__
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(span_name, cached=cached) as s:
+                result = func(*args, **kwargs)
+                s.payload(result)
+                return result
+        return wrapper
+    return decorator
+
+
+def snapshot():
+    """Copy of the process-wide per-stage totals (used by the benchmarks)."""
+    with _lock:
+        return {k: dict(v) for k, v in _totals.items()}
+
+
+# ----------------- Exporters -----------------
+def _escape_label(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def prometheus_text():
+    """Process-wide aggregates in the Prometheus text exposition format."""
+    totals = snapshot()
+    families = [
+        ("agribot_stage_duration_seconds", "summary", "Wall time spent per stage.", None),
+        ("agribot_stage_duration_seconds_max", "gauge", "Slowest observed call per stage.", "max"),
+        ("agribot_stage_cache_hits_total", "counter", "Cache hits per cached stage.", "cache_hits"),
+        ("agribot_stage_cache_misses_total", "counter", "Cache misses per cached stage.", "cache_misses"),
+        ("agribot_stage_payload_bytes_total", "counter", "Bytes returned per stage.", "bytes"),
+        ("agribot_stage_errors_total", "counter", "Failed calls per stage.", "errors"),
+    ]
+    lines = []
+    for metric, kind, help_text, field in families:
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} {kind}")
+        for name in sorted(totals):
+            label = f'{{stage="{_escape_label(name)}"}}'
+            tot = totals[name]
+            if field is None:
+                lines.append(f"{metric}_count{label} {tot['count']}")
+                lines.append(f"{metric}_sum{label} {tot['sum']:.6f}")
+            else:
+                lines.append(f"{metric}{label} {tot[field]}")
+    return "\n".join(lines) + "\n"
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics": self.send_error(404); return
+        body = prometheus_text().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass # scrapes every few seconds would flood the Streamlit log
+
+
+@st.cache_resource(show_spinner=False)
+def start_metrics_server(port=METRICS_PORT):
+    """Sidecar /metrics endpoint on a daemon thread, started once per process (no-op when METRICS_PORT is unset)."""
+    if not port: return None
+    try:
+        server = ThreadingHTTPServer(("0.0.0.0", port), _MetricsHandler)
+    except OSError as e:
+        print(f"Metrics endpoint not started on port {port}: {e}"); return None
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
+
+
+def _otel_value(value):
+    if isinstance(value, bool): return {"boolValue": value}
+    if isinstance(value, int): return {"intValue": str(value)}
+    if isinstance(value, float): return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def otel_json(spans, trace_id=None):
+    """Spans as an OTLP/JSON ExportTraceServiceRequest document."""
+    trace_id = trace_id or uuid.uuid4().hex
+    out = []
+    for s in spans:
+        item = {
+            "traceId": trace_id, "spanId": s.span_id, "name": s.name, "kind": 1,
+            "startTimeUnixNano": str(int(s.start * 1e9)),
+            "endTimeUnixNano": str(int((s.end or s.start) * 1e9)),
+            "attributes": [{"key": f"agribot.{k}", "value": _otel_value(v)} for k, v in s.attrs.items()],
+            "status": {"code": 2, "message": s.error} if s.error else {"code": 1},
+        }
+        if s.parent_id: item["parentSpanId"] = s.parent_id
+        out.append(item)
+    doc = {"resourceSpans": [{
+        "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": SERVICE_NAME}}]},
+        "scopeSpans": [{"scope": {"name": "agribot.metrics"}, "spans": out}],
+    }]}
+    return json.dumps(doc, ensure_ascii=False)
+
+
+# ----------------- Debug Panel -----------------
+def _waterfall_html(spans):
+    if not spans: return "<small>No spans recorded.</small>"
+    t0 = min(s.start for s in spans)
+    total = max((s.end or s.start) for s in spans) - t0 or 1e-9
+    rows = []
+    for s in sorted(spans, key=lambda x: x.start):
+        left = (s.start - t0) / total * 100
+        width = max(s.duration / total * 100, 0.5)
+        color = "#c62828" if s.error else ("#81c784" if s.attrs.get("cache_hit") else "#2E7D32")
+        extra = " ".join(f"{k}={v}" for k, v in s.attrs.items())
+        rows.append(
+            f"<div style='font-size:12px;margin:2px 0;'>"
+            f"<div style='padding-left:{s.depth * 10}px;'>{s.name} <b>{s.duration * 1000:.0f} ms</b> <small>{extra}</small></div>"
+            f"<div style='background:#eee;height:6px;border-radius:3px;'>"
+            f"<div style='margin-left:{left:.2f}%;width:{width:.2f}%;background:{color};height:6px;border-radius:3px;'></div></div></div>"
+        )
+    return "".join(rows)
+
+
+def render_debug_panel():
+    """Sidebar timing waterfall for the last rerun; enabled with AGRIBOT_DEBUG=1.
+    For monitoring, scrape METRICS_PORT instead of downloading the export here."""
+    if not DEBUG_PANEL: return
+    current = st.session_state.get("_trace_current", [])
+    last = st.session_state.get("_trace_last", [])
+    with st.sidebar.expander("⏱️ Debug: timings", expanded=False):
+        tab_last, tab_now = st.tabs(["Last rerun", "This rerun"])
+        with tab_last: st.markdown(_waterfall_html(last), unsafe_allow_html=True)
+        with tab_now: st.markdown(_waterfall_html(current), unsafe_allow_html=True)
+        st.download_button("Prometheus metrics", prometheus_text(), file_name="agribot_metrics.prom", mime="text/plain", key="dbg_prom")
+        st.download_button("OTLP JSON (last rerun)", otel_json(last or current), file_name="agribot_trace.json", mime="application/json", key="dbg_otel")
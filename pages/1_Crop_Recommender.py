@@ -1,20 +1,18 @@
 # pages/1_Crop_Recommender.py
 import streamlit as st
 import requests
-import os
-from groq import Groq
 from datetime import datetime
-import folium
-import streamlit.components.v1 as components
-from folium.plugins import MarkerCluster
-from dotenv import load_dotenv
 import io
 
 # --- Import shared functions ---
-from utils import apply_custom_css, t, language_toggle, get_kannada_audio_bytes
+from utils import apply_custom_css, t, language_toggle, play_kannada_audio, html_iframe
 from project_bot import render_project_bot # (NEW) Import floating bot
+from metrics import start_run, span, traced, mark_cache_miss, render_debug_panel
+from state_store import shared_cache
+from runtime import env, groq_client, DEFAULT_GROQ_MODEL
 
 # --- Apply CSS and Language Toggle ---
+start_run()
 apply_custom_css()
 with st.sidebar:
     language_toggle()
@@ -22,13 +20,9 @@ with st.sidebar:
 # Get current language
 lang = st.session_state.lang
 
-# ----------------- Load .env -----------------
-load_dotenv()
-OPENWEATHER_API_KEY = os.getenv("OPENWEATHER_API_KEY")
-GROQ_API_KEY = os.getenv("GROQ_API_KEY")
-
-# ----------------- Groq Client -----------------
-client = Groq(api_key=GROQ_API_KEY) if GROQ_API_KEY else None
+# ----------------- Config & Groq Client (shared, see runtime.py) -----------------
+OPENWEATHER_API_KEY = env("OPENWEATHER_API_KEY")
+client = groq_client()
 
 # ----------------- Session State (Page Specific) -----------------
 if "selected_crop" not in st.session_state: st.session_state.selected_crop = None
@@ -39,7 +33,9 @@ if "lon" not in st.session_state: st.session_state.lon = 77.5946
 
 # ----------------- Weather API -----------------
 @st.cache_data(ttl=300)
-def get_weather(lat, lon):
+@shared_cache("weather.coords", ttl=300)
+def _get_weather_cached(lat, lon):
+    mark_cache_miss()
     if not OPENWEATHER_API_KEY: return {"temp": 25, "humidity": 60, "rainfall": 0, "desc": "Clear", "icon": "01d"}
     try:
         url = f"https://api.openweathermap.org/data/2.5/weather?lat={lat}&lon={lon}&units=metric&appid={OPENWEATHER_API_KEY}"
@@ -49,13 +45,17 @@ def get_weather(lat, lon):
     except: pass
     return {"temp": 25, "humidity": 60, "rainfall": 0, "desc": "Clear", "icon": "01d"}
 
+def get_weather(lat, lon):
+    with span("weather", cached=True): return _get_weather_cached(lat, lon)
+
 # ----------------- LLM: 3 Ranked Crops -----------------
+@traced("llm.recommend")
 def get_crop_recommendations(n, p, k, ph, temp, hum, rain, state, district, month, lang):
     if not client: return ["1. Rice - Default", "2. Maize - Default", "3. Groundnut - Default"], "Rice Maize Groundnut"
     prompt = f"Recommend 3 crops for Indian farmer. Soil: N={n}, P={p}, K={k}, pH={ph}. Weather: {temp} deg C, {hum}% humidity, {rain} mm rain. Location: {state}, {district}, {month}. Rank: 1=best, 2=good, 3=viable. Format:\n1. [CROP] - [short reason]\n2. [CROP] - [short reason]\n3. [CROP] - [short reason]"
     if lang == "Kannada": prompt += " Answer in Kannada. Use 1. 2. 3."
     try:
-        chat = client.chat.completions.create(messages=[{"role": "user", "content": prompt}], model="llama-3.3-70b-versatile", temperature=0.3, max_tokens=300)
+        chat = client.chat.completions.create(messages=[{"role": "user", "content": prompt}], model=DEFAULT_GROQ_MODEL, temperature=0.3, max_tokens=300)
         response = chat.choices[0].message.content.strip()
         crops = [line.strip() for line in response.split('\n') if line.strip().startswith(('1.', '2.', '3.'))]
         while len(crops) < 3: crops.append(f"{len(crops)+1}. Unknown - Error")
@@ -66,12 +66,13 @@ def get_crop_recommendations(n, p, k, ph, temp, hum, rain, state, district, mont
     return ["1. Rice - Error", "2. Maize - Error", "3. Groundnut - Error"], "Rice Maize Groundnut"
 
 # ----------------- LLM: Full Crop Guide -----------------
+@traced("llm.guide")
 def get_crop_guide(crop, state, district, month, lang):
     if not client: return t("Guide not available in demo mode.", lang)
     prompt = f"Complete growing guide for {crop} in {state}, {district} during {month}. Include: Soil preparation, Sowing time, Seed rate, Spacing, Irrigation, Fertilizer (NPK), Pest control, Harvesting, Yield per acre, Market tips. Use bullets."
     if lang == "Kannada": prompt += " Answer in Kannada."
     try:
-        chat = client.chat.completions.create(messages=[{"role": "user", "content": prompt}], model="llama-3.3-70b-versatile", temperature=0.3, max_tokens=800)
+        chat = client.chat.completions.create(messages=[{"role": "user", "content": prompt}], model=DEFAULT_GROQ_MODEL, temperature=0.3, max_tokens=800)
         return chat.choices[0].message.content.strip()
     except Exception as e: return t(f"Error: {e}", lang)
 
@@ -138,8 +139,7 @@ with tab1:
             crops, audio_text = get_crop_recommendations( n, p, k, ph, temp_in, hum_in, rainfall, st.session_state.location["state"], st.session_state.location["district"], st.session_state.location["month"], lang )
             st.session_state.crops = crops
             if lang == "Kannada" and audio_text: 
-                audio_bytes = get_kannada_audio_bytes(audio_text)
-                if audio_bytes: st.audio(audio_bytes, autoplay=True, format="audio/mp3")
+                play_kannada_audio(audio_text)
 
     if st.session_state.get("crops"):
         st.markdown(f"### {t('Top 3 Recommended Crops', lang)}")
@@ -162,18 +162,26 @@ with tab1:
             st.markdown(f"### {t('Complete Guide for', lang)} **{st.session_state.selected_crop}**")
             st.markdown(f"""<div style='background:rgba(255,255,255,0.95); padding:25px; border-radius:15px; color:#1B5E20; line-height:2;'>{guide.replace('•', '<br>•')}</div>""", unsafe_allow_html=True)
             if lang == "Kannada": 
-                audio_bytes = get_kannada_audio_bytes(guide[:500]) # Limit guide to 500 chars for audio
-                if audio_bytes: st.audio(audio_bytes, autoplay=True, format="audio/mp3")
+                play_kannada_audio(guide)
 
 # ----------------- TAB 2: CROP MAP (STATIC) -----------------
-with tab2:
-    st.markdown(f"<h3 style='text-align:center;'>{t('Famous Crops by State (India)', lang)}</h3>", unsafe_allow_html=True); st.markdown(f"<p style='text-align:center;'>{t('This is a static map showing major crops.', lang)}</p>", unsafe_allow_html=True)
+@st.cache_data(show_spinner=False)
+def crop_map_html(lang):
+    """The map never changes, so it is built (and folium imported) once per language."""
+    mark_cache_miss()
+    import folium
+    from folium.plugins import MarkerCluster
     m = folium.Map(location=[22.97, 78.65], zoom_start=5); marker_cluster = MarkerCluster().add_to(m)
     for state, crop in FAMOUS_CROPS.items():
         coords = STATE_COORDS.get(state)
         if coords: popup = f"<b>{state}</b><br>{t('Famous Crop', lang)}: {t(crop, lang)}"; folium.Marker( location=coords, popup=popup, tooltip=f"{state}: {crop}", icon=folium.Icon(color='green', icon='leaf')).add_to(marker_cluster)
-    map_html = m._repr_html_()
-    components.html(map_html, height=600)
+    return m._repr_html_()
+
+with tab2:
+    st.markdown(f"<h3 style='text-align:center;'>{t('Famous Crops by State (India)', lang)}</h3>", unsafe_allow_html=True); st.markdown(f"<p style='text-align:center;'>{t('This is a static map showing major crops.', lang)}</p>", unsafe_allow_html=True)
+    with span("map.render", cached=True): map_html = crop_map_html(lang)
+    html_iframe(map_html, height=600)
 
 # (NEW) Render the floating bot at the end
-render_project_bot()
\ No newline at end of file
+render_project_bot()
+render_debug_panel()
\ No newline at end of file
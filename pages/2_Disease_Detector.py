@@ -1,19 +1,20 @@
 # pages/2_Disease_Detector.py
 import streamlit as st
 import numpy as np
-import tensorflow as tf
 from PIL import Image
 import requests
-from dotenv import load_dotenv
 import os
-from groq import Groq
 import io
 
 # --- Import shared functions ---
-from utils import apply_custom_css, t, language_toggle, get_kannada_audio_bytes
+from utils import apply_custom_css, t, language_toggle, play_kannada_audio
 from project_bot import render_project_bot # (NEW) Import floating bot
+from metrics import start_run, span, traced, mark_cache_miss, render_debug_panel
+from state_store import shared_cache
+from runtime import env, groq_client, DEFAULT_GROQ_MODEL
 
 # --- Apply CSS and Language Toggle ---
+start_run()
 apply_custom_css()
 with st.sidebar:
     language_toggle()
@@ -21,24 +22,26 @@ with st.sidebar:
 # Get current language
 lang = st.session_state.lang
 
-# ----------------- Load .env -----------------
-load_dotenv()
-OPENWEATHER_API_KEY = os.getenv("OPENWEATHER_API_KEY")
-GROQ_API_KEY = os.getenv("GROQ_API_KEY")
-
-# ----------------- Initialize Groq Client -----------------
-client = Groq(api_key=GROQ_API_KEY) if GROQ_API_KEY else None
+# ----------------- Config & Groq Client (shared, see runtime.py) -----------------
+OPENWEATHER_API_KEY = env("OPENWEATHER_API_KEY")
+client = groq_client()
+DISEASE_MODEL_PATH = env("DISEASE_MODEL_PATH", "FinalTest_inceptionv3.h5")
 
 # ----------------- Load Model -----------------
 @st.cache_resource
-def load_model():
-    model_path = "FinalTest_inceptionv3.h5" 
+def _load_model_cached():
+    mark_cache_miss()
+    model_path = DISEASE_MODEL_PATH
     if not os.path.exists(model_path):
         st.error(f"Model file not found at {model_path}. Please place it in the root directory.")
         return None
+    import tensorflow as tf # deferred: the import alone takes seconds, and only runs once per process
     custom_objects = {"mse": tf.keras.losses.MeanSquaredError()}
     return tf.keras.models.load_model(model_path, custom_objects=custom_objects)
 
+def load_model():
+    with span("model.load", cached=True): return _load_model_cached()
+
 model = load_model()
 
 # ----------------- Labels -----------------
@@ -46,7 +49,9 @@ class_labels = {0: "Brown Spot", 1: "Healthy Plant", 2: "Leaf Blast", 3: "Sheath
 
 # ----------------- Weather API -----------------
 @st.cache_data(ttl=300)
-def get_weather(city="Bangalore"):
+@shared_cache("weather.city", ttl=300)
+def _get_weather_cached(city):
+    mark_cache_miss()
     if not OPENWEATHER_API_KEY: return None
     try:
         url = f"http://api.openweathermap.org/data/2.5/weather?q={city}&appid={OPENWEATHER_API_KEY}&units=metric"
@@ -58,13 +63,17 @@ def get_weather(city="Bangalore"):
     except: pass
     return None
 
+def get_weather(city="Bangalore"):
+    with span("weather", cached=True): return _get_weather_cached(city)
+
 # ----------------- LLM Treatment (GROQ) -----------------
+@traced("llm.treatment")
 def get_treatment_from_llm(disease: str, lang: str):
     if not client: return t("LLM not available.", lang), None
     prompt = f"4 short, practical cure & prevention steps for paddy {disease}. Bullets only."
     if lang == "Kannada": prompt += " Answer in Kannada. Use • for bullets."
     try:
-        chat = client.chat.completions.create(messages=[{"role": "user", "content": prompt}], model="llama-3.3-70b-versatile", temperature=0.3, max_tokens=250)
+        chat = client.chat.completions.create(messages=[{"role": "user", "content": prompt}], model=DEFAULT_GROQ_MODEL, temperature=0.3, max_tokens=250)
         response = chat.choices[0].message.content.strip()
         lines = []
         for line in response.split('\n'):
@@ -84,6 +93,7 @@ def preprocess_image(img):
     img_array = np.expand_dims(img_array, axis=0)
     return img_array
 
+@traced("model.predict")
 def predict_image(model, img):
     try:
         img_array = preprocess_image(img)
@@ -162,8 +172,7 @@ if uploaded_file and model:
         """, unsafe_allow_html=True)
         
         if lang == "Kannada" and audio_text:
-            audio_bytes = get_kannada_audio_bytes(audio_text)
-            if audio_bytes: st.audio(audio_bytes, autoplay=True, format="audio/mp3")
+            play_kannada_audio(audio_text)
     else:
         st.error(t("An error occurred during prediction. Please try another image.", lang))
         
@@ -171,4 +180,5 @@ elif not model:
     st.error(t("Model not loaded. Please check file path.", lang))
 
 # (NEW) Render the floating bot at the end
-render_project_bot()
\ No newline at end of file
+render_project_bot()
+render_debug_panel()
\ No newline at end of file
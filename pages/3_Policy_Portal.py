@@ -1,12 +1,14 @@
 # pages/3_Policy_Portal.py
 import streamlit as st
-import requests
 
 # --- Import shared functions ---
 from utils import apply_custom_css, t, language_toggle
 from project_bot import render_project_bot # (NEW) Import floating bot
+from metrics import start_run, render_debug_panel
+from policy_catalog import load_catalog
 
 # --- Apply CSS and Language Toggle ---
+start_run()
 apply_custom_css()
 with st.sidebar:
     language_toggle()
@@ -14,19 +16,13 @@ with st.sidebar:
 # Get current language
 lang = st.session_state.lang
 
-# ----------------- Policies List (Links to real PDFs) -----------------
-POLICIES = [
-    {"year": "2004", "title": "Organic Farming Policy", "amount": "90% on inputs (Rs. 10,000/ha)", "free": "Free certification training", "desc": "Promotes organic clusters and eco-practices.", "pdf_url": "http://ofai.s3.amazonaws.com/Kar_OF_policy_2004.pdf"},
-    {"year": "2006", "title": "Agricultural Policy", "amount": "Rs. 5,000/ha for hybrids", "free": "Free soil testing", "desc": "Targets 4.5% growth with WTO adaptations.", "pdf_url": "https://raitamitra.karnataka.gov.in/storage/pdf-files/Agri%20Policy%20eng.pdf"},
-    {"year": "2017", "title": "Organic Crop Cluster Development", "amount": "50% certification (Rs. 1 lakh/group)", "free": "Free market linkages", "desc": "Supply chain for certified organics.", "pdf_url": "https://bangalorerural.nic.in/en/agriculture/"},
-    {"year": "2022", "title": "Samagra Krishi Abhiyaana", "amount": "Rs. 25,000 for milch animals (50%)", "free": "Free crop insurance for small farmers", "desc": "Rs. 5 lakh suicide relief; poly tarpal (90% subsidy).", "pdf_url": "https://www.manage.gov.in/fpoacademy/SGSchemes/karnataka.pdf"},
-    {"year": "2023", "title": "Annual Agriculture Report", "amount": "Rs. 50,000 for pump sets (50%)", "free": "Free ATMA extension services", "desc": "Rainfed crop support, Krishi Honda (90% subsidy).", "pdf_url": "https.raitamitra.karnataka.gov.in/info-4/ANNUAL+REPORT/en"},
-    {"year": "2024", "title": "Raitha Samruddhi Yojane", "amount": "Rs. 1 crore for harvester hubs (50-70%)", "free": "Free food processing training", "desc": "Consolidated schemes for sustainable farming.", "pdf_url": "https://www.thehindubusinessline.com/economy/agri-business/karnatakas-new-agri-scheme-to-make-farming-sustainable-lucrative/article67853797.ece"},
-    {"year": "2024", "title": "Farm Machinery Hubs", "amount": "Rs. 50 lakh for harvesters (50%)", "free": "Free labor shortage support", "desc": "Addresses harvest issues; 70% for FPOs.", "pdf_url": "https://www.thehindu.com/news/national/karnataka/karnataka-government-issues-guidelines-for-farm-machinery-hubs-to-address-problem-of-labour-shortage-during-harvest-season/article67768663.ece"},
-    {"year": "2025", "title": "PM KISAN Supplements", "amount": "Rs. 6,000/year + Rs. 5,000 state", "free": "Free insurance integration", "desc": "Direct income for small farmers.", "pdf_url": "https.raitamitra.karnataka.gov.in/info-2/Pradhan+Mantri+KIsan+Samman+Nidhi+(PM+KISAN)/en"},
-    {"year": "2025", "title": "Livestock Schemes (Pashu Bhagya)", "amount": "Rs. 1.20 lakh loan (33-50% subsidy)", "free": "Free for SC/ST widows", "desc": "Cattle/sheep units; 50% for minorities.", "pdf_url": "https://slbckarnataka.com/UserFiles/slbc/State%20Govt%20scheme%20details.pdf"},
-    {"year": "2025", "title": "Fertilizer & Manure Subsidy", "amount": "50% on bio-fertilizers (Rs. 50,000 max)", "free": "Free micronutrients for small farms", "desc": "Gypsum, green manure distribution.", "pdf_url": "https.raitamitra.karnataka.gov.in/info-2/FERTILIZER+AND+MANURE/en"},
-]
+# ----------------- Policy Catalog (prebuilt, see scripts/build_policy_catalog.py) -----------------
+catalog = load_catalog()
+
+def pf(policy, key):
+    """Policy field in the current language; translates on the fly only if the artifact is not built."""
+    if catalog.prebuilt or lang != "Kannada": return catalog.field(policy, key, lang)
+    return t(policy[key], lang)
 
 # ----------------- Session State (Page Specific) -----------------
 if "selected_policy" not in st.session_state:
@@ -41,14 +37,16 @@ st.markdown("---")
 st.markdown(f"### {t('Policy Details', lang)}")
 details_container = st.container(height=350) # The stable, scrollable box
 
-if st.session_state.selected_policy is None:
+if st.session_state.selected_policy not in catalog.by_id:
     details_container.info(t("Select a policy from the list below to see its details here.", lang))
 else:
-    p = st.session_state.selected_policy
-    details_container.markdown(f"#### {t(p['title'], lang)} ({p['year']})")
-    details_container.markdown(f"**{t('Description', lang)}:** {t(p['desc'], lang)}")
+    p = catalog.by_id[st.session_state.selected_policy]
+    details_container.markdown(f"#### {pf(p, 'title')} ({p['year']})")
+    details_container.markdown(f"**{t('Description', lang)}:** {pf(p, 'desc')}")
     details_container.markdown(f"**{t('Subsidy', lang)}:** {p['amount']}")
-    details_container.markdown(f"**{t('Free Benefit', lang)}:** {t(p['free'], lang)}")
+    details_container.markdown(f"**{t('Free Benefit', lang)}:** {pf(p, 'free')}")
+    audio_path = catalog.audio_path(p) if lang == "Kannada" else None
+    if audio_path: details_container.audio(audio_path, format="audio/mp3")
     
     col1, col2 = details_container.columns(2)
     with col1:
@@ -63,16 +61,26 @@ else:
 # --- 2. List of All Policies ---
 st.markdown("---")
 st.markdown(f"### {t('Available Schemes', lang)}")
+f1, f2, f3 = st.columns([2, 1, 1])
+with f1: keyword = st.text_input(t("Search schemes", lang), key="policy_search")
+with f2: years = st.multiselect(t("Year", lang), catalog.years, key="policy_years")
+with f3:
+    type_options = [""] + catalog.subsidy_types
+    subsidy_type = st.selectbox(t("Subsidy type", lang), type_options, key="policy_type",
+                                format_func=lambda x: t("All", lang) if not x else t(x.title(), lang))
+results = catalog.search(keyword, years=years, subsidy_type=subsidy_type or None)
+if not results: st.info(t("No schemes match your filters.", lang))
 col1, col2 = st.columns(2)
-for i, p in enumerate(POLICIES):
+for i, p in enumerate(results):
     target_col = col1 if i % 2 == 0 else col2
-    with target_col.expander(f"**{p['year']} - {t(p['title'], lang)}**", expanded=False):
+    with target_col.expander(f"**{p['year']} - {pf(p, 'title')}**", expanded=False):
         st.markdown(f"**{t('Subsidy', lang)}:** {p['amount']}")
-        st.markdown(f"**{t('Benefit', lang)}:** {t(p['free'], lang)}")
+        st.markdown(f"**{t('Benefit', lang)}:** {pf(p, 'free')}")
         
-        if st.button(t("Show Details", lang), key=f"details_{i}"):
-            st.session_state.selected_policy = p
+        if st.button(t("Show Details", lang), key=f"details_{p['id']}"):
+            st.session_state.selected_policy = p["id"]
             st.rerun()
 
 # (NEW) Render the floating bot at the end
-render_project_bot()
\ No newline at end of file
+render_project_bot()
+render_debug_panel()
\ No newline at end of file
@@ -0,0 +1,101 @@
+# policy_catalog.py
+import os
+import re
+import json
+import bisect
+import hashlib
+
+import streamlit as st
+
+from metrics import span
+
+# ----------------- Paths -----------------
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+SOURCE_PATH = os.path.join(DATA_DIR, "policies.json")        # hand-edited, versioned source
+CATALOG_PATH = os.path.join(DATA_DIR, "policy_catalog.json") # built by scripts/build_policy_catalog.py
+CATALOG_VERSION = 1
+TRANSLATED_FIELDS = ("title", "desc", "free")
+
+_TOKEN_RE = re.compile(r"[\w\u0C80-\u0CFF]+") # \w alone splits Kannada words at vowel signs and the virama
+
+
+def tokenize(text):
+    return [tok.lower() for tok in _TOKEN_RE.findall(text or "")]
+
+
+def source_digest(path=SOURCE_PATH):
+    with open(path, "rb") as f: return hashlib.sha256(f.read()).hexdigest()
+
+
+def summary_text(fields):
+    """Text voiced by the pre-rendered TTS summary of a policy."""
+    return ". ".join(fields[k] for k in TRANSLATED_FIELDS if fields.get(k))
+
+
+# ----------------- In-memory Index -----------------
+class PolicyCatalog:
+    """Policies plus lookup tables for filtering by year, subsidy type and keyword."""
+
+    def __init__(self, policies, prebuilt=False):
+        self.policies = policies
+        self.prebuilt = prebuilt
+        self.by_id = {p["id"]: p for p in policies}
+        self.years = sorted({p["year"] for p in policies})
+        self.subsidy_types = sorted({p["subsidy_type"] for p in policies})
+        self._by_year, self._by_type, self._by_token = {}, {}, {}
+        for p in policies:
+            self._by_year.setdefault(p["year"], set()).add(p["id"])
+            self._by_type.setdefault(p["subsidy_type"], set()).add(p["id"])
+            text = " ".join([p["title"], p["desc"], p["free"], p["amount"], p["subsidy_type"]] + list(p.get("kn", {}).values()))
+            for tok in set(tokenize(text)):
+                self._by_token.setdefault(tok, set()).add(p["id"])
+        self._vocab = sorted(self._by_token)
+        self._order = {p["id"]: i for i, p in enumerate(policies)}
+
+    def _prefix_ids(self, prefix):
+        ids = set()
+        i = bisect.bisect_left(self._vocab, prefix)
+        while i < len(self._vocab) and self._vocab[i].startswith(prefix):
+            ids |= self._by_token[self._vocab[i]]; i += 1
+        return ids
+
+    def search(self, keyword="", years=None, subsidy_type=None):
+        """Returns matching policies in catalog order. Every keyword token must match a word prefix."""
+        ids = set(self.by_id)
+        if years: ids &= set().union(*(self._by_year.get(y, set()) for y in years))
+        if subsidy_type: ids &= self._by_type.get(subsidy_type, set())
+        for tok in tokenize(keyword):
+            ids &= self._prefix_ids(tok)
+            if not ids: break
+        return [self.by_id[i] for i in sorted(ids, key=self._order.get)]
+
+    def field(self, policy, key, lang):
+        """Pre-translated field when available, otherwise the English source text."""
+        if lang == "Kannada": return policy.get("kn", {}).get(key, policy[key])
+        return policy[key]
+
+    def audio_path(self, policy):
+        rel = policy.get("audio")
+        if not rel: return None
+        path = os.path.join(DATA_DIR, rel)
+        return path if os.path.exists(path) else None
+
+
+# ----------------- Loader -----------------
+@st.cache_resource(show_spinner=False)
+def load_catalog():
+    """Loads the prebuilt bilingual artifact once per process; falls back to the
+    English source when the artifact is missing or was built from an older source."""
+    with span("policy.catalog_load") as s:
+        digest = source_digest()
+        if os.path.exists(CATALOG_PATH):
+            with open(CATALOG_PATH, encoding="utf-8") as f: doc = json.load(f)
+            if doc.get("version") == CATALOG_VERSION and doc.get("source_sha256") == digest:
+                s.set("prebuilt", True)
+                return PolicyCatalog(doc["policies"], prebuilt=True)
+            print("Policy catalog is stale; run scripts/build_policy_catalog.py")
+        else:
+            print("Policy catalog not built; run scripts/prepare_deploy.py (Kannada is translated per rerun until then)")
+        with open(SOURCE_PATH, encoding="utf-8") as f: doc = json.load(f)
+        s.set("prebuilt", False)
+        return PolicyCatalog(doc["policies"], prebuilt=False)
@@ -1,19 +1,8 @@
 # project_bot.py
 import streamlit as st
-from groq import Groq
-from dotenv import load_dotenv
-import os
 from streamlit_modal import Modal # <-- (NEW) This is the correct library
-
-# -----------------
-# Load API Key
-# -----------------
-load_dotenv()
-GROQ_API_KEY = os.getenv("GROQ_API_KEY")
-if not GROQ_API_KEY:
-    print("Warning: GROQ_API_KEY not found for project_bot.py")
-
-client = Groq(api_key=GROQ_API_KEY) if GROQ_API_KEY else None
+from metrics import traced
+from runtime import groq_client, DEFAULT_GROQ_MODEL
 
 # -----------------
 # The System Prompt
@@ -38,7 +27,9 @@ Here is a summary of the app's features:
 # -----------------
 # The Chatbot's API Call
 # -----------------
+@traced("llm.project_bot")
 def call_project_bot_api(message_history):
+    client = groq_client() # shared client, created on the first question rather than at import
     if not client:
         return "Chatbot API is not configured. Please check your .env file."
     
@@ -50,7 +41,7 @@ def call_project_bot_api(message_history):
     try:
         chat = client.chat.completions.create(
             messages=messages_payload,
-            model="llama-3.3-70b-versatile",
+            model=DEFAULT_GROQ_MODEL,
             temperature=0.2, 
             max_tokens=300
         )
@@ -64,67 +55,14 @@ def call_project_bot_api(message_history):
 # -----------------
 def render_project_bot():
     
-    # --- (THIS IS THE FIX) ---
-    
-    # 1. Add all CSS styling
-    st.markdown("""
-    <style>
-    /* Style the modal header */
-    div[data-testid="stModal"] > div:first-child > div:first-child {
-        background-color: #E8F5E9; /* Light green header */
-    }
-    /* Style the modal title */
-    div[data-testid="stModal"] > div:first-child > div:first-child > div:first-child {
-        color: #1B5E20 !important; /* Dark green title */
-        font-weight: 600;
-    }
-    
-    /* Style the modal's official Close button */
-    div[data-testid="stModal"] button[aria-label="Close"] {
-        background-color: #FFFFFF;
-        color: #1B5E20;
-        border-radius: 50%;
-        border: 1px solid #1B5E20;
-    }
-    div[data-testid="stModal"] button[aria-label="Close"]:hover {
-        background-color: #D3EADC;
-    }
+    # 1. Modal and floating-button styles ship with the global stylesheet (assets/agribot.css)
 
-    /* Style the floating button */
-    button[data-testid="stButton"][key="open-chat-modal"] {
-        position: fixed;
-        bottom: 3rem;      /* MOVED UP */
-        right: 1.5rem;     /* MOVED FROM EDGE */
-        background-color: #2E7D32;
-        color: white;
-        border: none;
-        border-radius: 50%;
-        width: 55px;
-        height: 55px;
-        font-size: 28px;
-        box-shadow: 0 4px 12px rgba(0,0,0,0.25);
-        z-index: 1000;
-        cursor: pointer;
-    }
-    button[data-testid="stButton"][key="open-chat-modal"]:hover {
-        background-color: #1B5E20;
-        transform: scale(1.1);
-    }
-    
-    /* Hide the label for the text_input inside the form */
-    div[data-testid="stForm"] label {
-        display: none;
-    }
-    </style>
-    """, unsafe_allow_html=True)
-    
     # 2. Define the Modal *without* the bad 'css_style' argument
     modal = Modal(
         "💬 Agri-Bot Help Center", 
         key="project-bot-modal",
         max_width=600
     )
-    # --- (END OF FIX) ---
 
     # 3. Create the floating button
     st.button("💬", key="open-chat-modal")
@@ -0,0 +1,79 @@
+# pwa/build_precache.py
+"""Generates pwa/precache-manifest.js for the service worker.
+
+The precache holds the app shell: Streamlit's index.html plus every script,
+stylesheet and font it references up front, the PWA manifest and icons, and
+the files under ./static. Lazily loaded Streamlit chunks are not precached;
+the service worker caches them on first use instead, which keeps the
+first install small on 2G/3G connections.
+
+Each entry carries a content hash, and the cache version is derived from all
+of them, so re-running this after a Streamlit upgrade or an asset change
+rolls the cache over on the next visit.
+
+Usage:
+    python pwa/build_precache.py
+"""
+import os
+import json
+import hashlib
+from html.parser import HTMLParser
+
+import streamlit
+
+PWA_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(PWA_DIR)
+APP_STATIC_DIR = os.path.join(ROOT_DIR, "static")
+STREAMLIT_STATIC_DIR = os.path.join(os.path.dirname(streamlit.__file__), "static")
+OUTPUT_PATH = os.path.join(PWA_DIR, "precache-manifest.js")
+
+PWA_FILES = ["manifest.json", "icon-192.png", "icon-512.png"] # served from / by the reverse proxy (pwa/nginx.conf)
+CSS_PATH = os.path.join(ROOT_DIR, "assets", "agribot.css")            # served at /agribot.css, same proxy
+
+
+class _ShellAssets(HTMLParser):
+    """Collects the ./static/... URLs index.html loads before the app starts."""
+
+    def __init__(self):
+        super().__init__()
+        self.urls = []
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        url = attrs.get("src") if tag == "script" else attrs.get("href") if tag == "link" else None
+        if url and url.startswith("./") and url not in self.urls: self.urls.append(url)
+
+
+def _revision(path):
+    with open(path, "rb") as f: return hashlib.sha256(f.read()).hexdigest()[:12]
+
+
+def collect_entries():
+    entries = [{"url": "/", "revision": _revision(os.path.join(STREAMLIT_STATIC_DIR, "index.html"))}]
+    parser = _ShellAssets()
+    with open(os.path.join(STREAMLIT_STATIC_DIR, "index.html"), encoding="utf-8") as f: parser.feed(f.read())
+    for url in parser.urls:
+        path = os.path.join(STREAMLIT_STATIC_DIR, url[2:])
+        if os.path.isfile(path): entries.append({"url": url[1:], "revision": _revision(path)})
+    for name in PWA_FILES:
+        entries.append({"url": f"/{name}", "revision": _revision(os.path.join(PWA_DIR, name))})
+    entries.append({"url": "/agribot.css", "revision": _revision(CSS_PATH)})
+    if os.path.isdir(APP_STATIC_DIR):
+        for name in sorted(os.listdir(APP_STATIC_DIR)):
+            path = os.path.join(APP_STATIC_DIR, name)
+            if os.path.isfile(path): entries.append({"url": f"/app/static/{name}", "revision": _revision(path)})
+    return entries
+
+
+def main():
+    entries = collect_entries()
+    version = hashlib.sha256(json.dumps(entries, sort_keys=True).encode()).hexdigest()[:10]
+    with open(OUTPUT_PATH, "w", encoding="utf-8") as f:
+        f.write("// Generated by pwa/build_precache.py -- do not edit.\n")
+        f.write(f"self.__PRECACHE_VERSION = {json.dumps(version)};\n")
+        f.write(f"self.__PRECACHE_MANIFEST = {json.dumps(entries, indent=2)};\n")
+    print(f"wrote {len(entries)} entries (version {version}) to {OUTPUT_PATH}")
+
+
+if __name__ == "__main__":
+    main()
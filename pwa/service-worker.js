@@ -1,7 +1,106 @@
 // pwa/service-worker.js
+// Offline-first caching for Agri-Bot. The precache list is generated by
+// pwa/build_precache.py; the proxy in pwa/nginx.conf serves this file at /.
+importScripts("/precache-manifest.js");
+
+const VERSION = self.__PRECACHE_VERSION || "dev";
+const PRECACHE = `agribot-precache-${VERSION}`;
+const RUNTIME = "agribot-runtime";  // lazily loaded Streamlit chunks (content-hashed)
+const TILES = "agribot-tiles";      // map tiles, Leaflet assets, weather icons
+const AUDIO = "agribot-audio";      // generated TTS audio served from /media/
+const LIMITS = { [TILES]: 400, [AUDIO]: 60 };
+const KNOWN = [PRECACHE, RUNTIME, TILES, AUDIO];
+
+const PRECACHE_URLS = (self.__PRECACHE_MANIFEST || []).map((entry) => entry.url);
+const TILE_HOSTS = [/(^|\.)tile\.openstreetmap\.org$/, /^cdn\.jsdelivr\.net$/, /^cdnjs\.cloudflare\.com$/, /^netdna\.bootstrapcdn\.com$/, /^openweathermap\.org$/];
+
+// ----------------- Lifecycle -----------------
 self.addEventListener("install", (event) => {
-  console.log("Service Worker installing.");
+  event.waitUntil(
+    caches.open(PRECACHE).then((cache) => cache.addAll(PRECACHE_URLS)).then(() => self.skipWaiting())
+  );
 });
+
+self.addEventListener("activate", (event) => {
+  event.waitUntil(
+    caches.keys()
+      .then((keys) => Promise.all(keys.filter((k) => k.startsWith("agribot-") && !KNOWN.includes(k)).map((k) => caches.delete(k))))
+      .then(() => self.clients.claim())
+  );
+});
+
+// ----------------- Strategies -----------------
+async function trim(cacheName) {
+  const limit = LIMITS[cacheName];
+  if (!limit) return;
+  const cache = await caches.open(cacheName);
+  const keys = await cache.keys();
+  for (let i = 0; i < keys.length - limit; i++) await cache.delete(keys[i]);
+}
+
+async function cacheFirst(request, cacheName) {
+  const cached = await caches.match(request, { ignoreSearch: cacheName === PRECACHE });
+  if (cached) return cached;
+  const response = await fetch(request);
+  if (response.ok || response.type === "opaque") {
+    const cache = await caches.open(cacheName);
+    await cache.put(request, response.clone());
+    trim(cacheName);
+  }
+  return response;
+}
+
+async function staleWhileRevalidate(event, cacheName, request = event.request) {
+  const cache = await caches.open(cacheName);
+  const cached = await cache.match(request);
+  const network = fetch(request).then((response) => {
+    if (response.ok || response.type === "opaque") {
+      cache.put(request, response.clone()).then(() => trim(cacheName));
+    }
+    return response;
+  });
+  if (cached) {
+    event.waitUntil(network.catch(() => undefined));
+    return cached;
+  }
+  return network;
+}
+
+// ----------------- Routing -----------------
 self.addEventListener("fetch", (event) => {
-  event.respondWith(fetch(event.request));
+  const request = event.request;
+  if (request.method !== "GET") return;
+  const url = new URL(request.url);
+  const sameOrigin = url.origin === self.location.origin;
+
+  // Websocket, health checks, uploads and component iframes always go to the server.
+  if (sameOrigin && (url.pathname.startsWith("/_stcore/") || url.pathname.startsWith("/component/"))) return;
+
+  if (request.mode === "navigate" && sameOrigin) {
+    // Every Streamlit page is the same shell; the app content arrives over the websocket.
+    event.respondWith(
+      staleWhileRevalidate(event, PRECACHE, new Request("/")).catch(() => caches.match("/"))
+    );
+    return;
+  }
+  if (sameOrigin && PRECACHE_URLS.includes(url.pathname)) {
+    event.respondWith(cacheFirst(request, PRECACHE));
+    return;
+  }
+  if (sameOrigin && url.pathname.startsWith("/media/")) {
+    // st.audio URLs are content-hashed, so they never go stale. The audio element
+    // sends Range requests; cache and serve the full file instead.
+    event.respondWith(cacheFirst(new Request(url.href), AUDIO));
+    return;
+  }
+  if (sameOrigin && url.pathname.startsWith("/static/")) {
+    event.respondWith(cacheFirst(request, RUNTIME));
+    return;
+  }
+  // Policy documents are not cached: they open as cross-origin top-level
+  // navigations (target="_blank"), which this origin's worker never sees.
+  if (TILE_HOSTS.some((re) => re.test(url.hostname))) {
+    event.respondWith(staleWhileRevalidate(event, TILES));
+    return;
+  }
 });
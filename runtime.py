@@ -0,0 +1,45 @@
+# runtime.py
+"""Process-wide configuration and shared clients, created lazily on first use.
+
+Pages and modules call env() / groq_client() / recognizer() instead of running
+load_dotenv and building their own clients at import time, so the .env file
+is parsed once per process and heavy SDKs are only imported when needed.
+"""
+import os
+import functools
+
+DEFAULT_GROQ_MODEL = "llama-3.3-70b-versatile"
+
+
+# ----------------- Config -----------------
+@functools.lru_cache(maxsize=None)
+def _load_env():
+    from dotenv import load_dotenv, find_dotenv
+    load_dotenv(find_dotenv())
+    return True
+
+
+def env(name, default=None):
+    """os.getenv with the project's .env applied (loaded once per process)."""
+    _load_env()
+    return os.getenv(name, default)
+
+
+def env_int(name, default):
+    return int(env(name, default))
+
+
+# ----------------- Clients -----------------
+@functools.lru_cache(maxsize=None)
+def groq_client():
+    """Shared Groq client, or None when GROQ_API_KEY is not set."""
+    api_key = env("GROQ_API_KEY")
+    if not api_key: return None
+    from groq import Groq
+    return Groq(api_key=api_key)
+
+
+@functools.lru_cache(maxsize=None)
+def recognizer():
+    import speech_recognition as sr
+    return sr.Recognizer()
@@ -0,0 +1,59 @@
+# scripts/build_background.py
+"""Fetches the app's field photo and writes compressed copies to ./static.
+
+The original design used a 2074 px Unsplash photo hot-linked from every page.
+This downloads the same photo once and re-encodes it at BG_WIDTH px:
+static/background.webp (primary) and static/background.jpg (progressive
+fallback for browsers without WebP). Both are served through Streamlit
+static serving at app/static/ and precached by the service worker.
+
+Usage:
+    python scripts/build_background.py [--force] [--width 1280] [--quality 70]
+
+Existing files are kept unless --force is given, so on a persistent host
+scripts/prepare_deploy.py only needs the CDN the first time. The outputs are
+gitignored; without them the stylesheet falls back to a plain green background.
+"""
+import os
+import io
+import argparse
+
+import requests
+from PIL import Image
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STATIC_DIR = os.path.join(ROOT_DIR, "static")
+PHOTO_URL = "https://images.unsplash.com/photo-1500595046743-cd271d6942ee"
+BG_WIDTH = 1280
+OUTPUTS = {"background.webp": "WEBP", "background.jpg": "JPEG"}
+
+
+def fetch_photo(width):
+    # Ask the image CDN for a slightly larger JPEG than needed and do the final resize locally
+    resp = requests.get(PHOTO_URL, params={"w": width * 2, "q": 90, "fm": "jpg", "fit": "crop"}, timeout=30)
+    resp.raise_for_status()
+    return Image.open(io.BytesIO(resp.content)).convert("RGB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--force", action="store_true", help="re-fetch even if the images exist")
+    parser.add_argument("--width", type=int, default=BG_WIDTH)
+    parser.add_argument("--quality", type=int, default=70)
+    args = parser.parse_args()
+
+    paths = {name: os.path.join(STATIC_DIR, name) for name in OUTPUTS}
+    if not args.force and all(os.path.exists(p) for p in paths.values()):
+        print("background images present; use --force to rebuild"); return
+
+    img = fetch_photo(args.width)
+    if img.width > args.width: img = img.resize((args.width, round(img.height * args.width / img.width)), Image.LANCZOS)
+    os.makedirs(STATIC_DIR, exist_ok=True)
+    for name, fmt in OUTPUTS.items():
+        options = {"method": 6} if fmt == "WEBP" else {"optimize": True, "progressive": True}
+        img.save(paths[name], fmt, quality=args.quality, **options)
+        print(f"wrote {paths[name]} ({img.width}x{img.height}, {os.path.getsize(paths[name]) // 1024} KB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+# scripts/build_policy_catalog.py
+"""Builds data/policy_catalog.json from data/policies.json.
+
+Every translatable field is pre-translated into Kannada and a Kannada TTS
+summary is rendered to data/policy_audio/<id>.mp3, so the Policy Portal
+never calls the translator or gTTS at request time.
+
+Usage:
+    python scripts/build_policy_catalog.py [--no-audio]
+
+Re-run after every edit of data/policies.json; the page detects a stale
+artifact via the source hash and falls back to English until rebuilt.
+"""
+import os
+import sys
+import json
+import argparse
+from datetime import datetime, timezone
+
+from deep_translator import GoogleTranslator
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from policy_catalog import ( # noqa: E402
+    CATALOG_PATH, CATALOG_VERSION, DATA_DIR, SOURCE_PATH, TRANSLATED_FIELDS, source_digest, summary_text
+)
+from utils import get_kannada_audio_bytes # noqa: E402
+
+AUDIO_DIR = "policy_audio"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--no-audio", action="store_true", help="skip rendering TTS summaries")
+    args = parser.parse_args()
+
+    with open(SOURCE_PATH, encoding="utf-8") as f: source = json.load(f)
+    translator = GoogleTranslator(source="en", target="kn")
+    os.makedirs(os.path.join(DATA_DIR, AUDIO_DIR), exist_ok=True)
+
+    policies = []
+    for p in source["policies"]:
+        entry = dict(p)
+        entry["kn"] = {k: translator.translate(p[k]) for k in TRANSLATED_FIELDS}
+        if not args.no_audio:
+            audio = get_kannada_audio_bytes(summary_text(entry["kn"]))
+            if audio:
+                rel = f"{AUDIO_DIR}/{p['id']}.mp3"
+                with open(os.path.join(DATA_DIR, rel), "wb") as f: f.write(audio)
+                entry["audio"] = rel
+        policies.append(entry)
+        print(f"built {p['id']}")
+
+    doc = {
+        "version": CATALOG_VERSION,
+        "source_version": source.get("version"),
+        "source_sha256": source_digest(),
+        "built_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "policies": policies,
+    }
+    with open(CATALOG_PATH, "w", encoding="utf-8") as f:
+        json.dump(doc, f, ensure_ascii=False, separators=(",", ":"))
+    print(f"wrote {len(policies)} policies to {CATALOG_PATH}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+# scripts/prepare_deploy.py
+"""Builds the generated artifacts a deployment needs, in order.
+
+  1. scripts/build_background.py     -> static/background.webp, .jpg
+     (optional; downloads the photo from the Unsplash CDN, skipped once built)
+  2. scripts/build_policy_catalog.py -> data/policy_catalog.json, data/policy_audio/
+     (optional; needs network access to the translator and gTTS)
+  3. pwa/build_precache.py           -> pwa/precache-manifest.js (required)
+
+All of these outputs are gitignored, so run this on every deploy, after
+installing requirements and before starting `streamlit run AgriBot.py` (see
+pwa/nginx.conf for the reverse proxy). A failed optional step only degrades
+the app (plain green background / English-only policy catalog translated
+per rerun) and is reported at the end; the required step always runs, since
+the service worker cannot install without its manifest. The exit status is
+non-zero only if the required step fails.
+
+Usage:
+    python scripts/prepare_deploy.py [--no-audio]
+"""
+import os
+import sys
+import argparse
+import subprocess
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--no-audio", action="store_true", help="skip the Kannada policy summaries")
+    args = parser.parse_args()
+
+    steps = [ # (command, required)
+        (["scripts/build_background.py"], False),
+        (["scripts/build_policy_catalog.py"] + (["--no-audio"] if args.no_audio else []), False),
+        (["pwa/build_precache.py"], True),
+    ]
+    skipped = []
+    for step, required in steps:
+        print(f"$ python {' '.join(step)}")
+        result = subprocess.run([sys.executable] + step, cwd=ROOT_DIR)
+        if result.returncode and required: sys.exit(result.returncode)
+        if result.returncode: skipped.append(step[0])
+    for name in skipped: print(f"WARNING: optional step {name} failed; the app runs without its output")
+
+
+if __name__ == "__main__":
+    main()
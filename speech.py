@@ -0,0 +1,94 @@
+# speech.py
+import io
+import queue
+from concurrent.futures import ThreadPoolExecutor
+
+import streamlit as st
+
+from metrics import span
+from runtime import env, env_int, recognizer
+
+# ----------------- Config -----------------
+# "google" = online Google Web Speech API, "whisper" = local CPU model via faster-whisper
+SPEECH_BACKEND = env("SPEECH_BACKEND", "google").lower()
+WHISPER_MODEL = env("WHISPER_MODEL", "small")
+WHISPER_COMPUTE_TYPE = env("WHISPER_COMPUTE_TYPE", "int8")
+WHISPER_CPU_THREADS = env_int("WHISPER_CPU_THREADS", 4)
+SPEECH_WORKERS = env_int("SPEECH_WORKERS", 2)
+
+
+class SpeechBackendUnavailable(RuntimeError):
+    """The configured backend cannot run here (unknown name or missing package): a setup problem, not bad audio."""
+
+
+# ----------------- Google (online) -----------------
+def recognize_google(audio_bytes: bytes, language: str = "kn-IN") -> str:
+    try:
+        import speech_recognition as sr # deferred: only the google backend needs it
+    except ImportError as e:
+        raise SpeechBackendUnavailable("SpeechRecognition is not installed (pip install SpeechRecognition)") from e
+    rec = recognizer()
+    with sr.AudioFile(io.BytesIO(audio_bytes)) as source: audio_data = rec.record(source)
+    return rec.recognize_google(audio_data, language=language)
+
+
+# ----------------- Whisper (local, CPU) -----------------
+@st.cache_resource(show_spinner=False)
+def load_whisper_model(model_name: str = WHISPER_MODEL):
+    """Loads the faster-whisper model once per process (downloaded on first use)."""
+    try:
+        from faster_whisper import WhisperModel # optional dependency, only needed for SPEECH_BACKEND=whisper
+    except ImportError as e:
+        raise SpeechBackendUnavailable("SPEECH_BACKEND=whisper needs faster-whisper (pip install faster-whisper)") from e
+    with span("speech.model_load", model=model_name):
+        return WhisperModel(model_name, device="cpu", compute_type=WHISPER_COMPUTE_TYPE, cpu_threads=WHISPER_CPU_THREADS)
+
+
+@st.cache_resource(show_spinner=False)
+def get_speech_pool():
+    """Bounded worker pool shared by all sessions, so recognition never runs on the script thread."""
+    return ThreadPoolExecutor(max_workers=SPEECH_WORKERS, thread_name_prefix="speech")
+
+
+def _whisper_worker(model, audio_bytes, language, out):
+    try:
+        segments, _ = model.transcribe(io.BytesIO(audio_bytes), language=language, beam_size=1, vad_filter=True)
+        for seg in segments: out.put(seg.text.strip()) # segments are decoded lazily, one by one
+        out.put(None)
+    except Exception as e:
+        out.put(e)
+
+
+def _whisper_stream(audio_bytes: bytes, language: str):
+    model = load_whisper_model()
+    out = queue.Queue()
+    get_speech_pool().submit(_whisper_worker, model, audio_bytes, language.split("-")[0], out)
+    parts = []
+    while True:
+        item = out.get()
+        if item is None: return
+        if isinstance(item, Exception): raise item
+        if item:
+            parts.append(item)
+            yield " ".join(parts)
+
+
+# ----------------- Public API -----------------
+def transcribe_stream(audio_bytes: bytes, language: str = "kn-IN", backend: str = None):
+    """Yields the growing transcript as partial results arrive; the last value is final.
+    Yields nothing when no speech was found (e.g. silence removed by the VAD)."""
+    backend = (backend or SPEECH_BACKEND).lower()
+    if backend == "whisper":
+        yield from _whisper_stream(audio_bytes, language)
+    elif backend == "google":
+        # One request, no partials; still runs on the pool like whisper
+        text = get_speech_pool().submit(recognize_google, audio_bytes, language).result()
+        if text: yield text
+    else:
+        raise SpeechBackendUnavailable(f"Unknown SPEECH_BACKEND: {backend}")
+
+
+def transcribe(audio_bytes: bytes, language: str = "kn-IN", backend: str = None) -> str:
+    text = ""
+    for text in transcribe_stream(audio_bytes, language, backend): pass
+    return text
@@ -0,0 +1,295 @@
+# state_store.py
+import os
+import json
+import time
+import uuid
+import sqlite3
+import hashlib
+import functools
+import threading
+from collections import OrderedDict
+
+import streamlit as st
+
+from metrics import span
+from runtime import env, env_int
+
+# ----------------- Config -----------------
+# "memory" = per-process (single replica), "sqlite" = shared file, "redis" = shared server
+STATE_BACKEND = env("STATE_BACKEND", "memory").lower()
+STATE_URL = env("STATE_URL", "") # sqlite: file path, redis: redis://host:6379/0
+HISTORY_TTL = env_int("HISTORY_TTL", 7 * 24 * 3600)
+CACHE_TTL = env_int("CACHE_TTL", 7 * 24 * 3600) # default expiry of shared_cache entries
+MEMORY_MAX_BYTES = env_int("STATE_MEMORY_MAX_MB", 64) * 2**20 # memory backend cap, least recently used go first
+DEFAULT_SQLITE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "agribot_state.db")
+
+
+# ----------------- Backends -----------------
+class StateBackend:
+    """Byte-valued key/value store with optional per-key TTL (seconds), plus
+    append-only lists (append/items) that writers never overwrite."""
+
+    def get(self, key):
+        raise NotImplementedError
+
+    def set(self, key, value, ttl=None):
+        raise NotImplementedError
+
+    def delete(self, key):
+        raise NotImplementedError
+
+    def append(self, key, value, ttl=None):
+        """Appends to the list at key and restarts its TTL."""
+        raise NotImplementedError
+
+    def items(self, key):
+        """All values appended to key, oldest first."""
+        raise NotImplementedError
+
+    def get_json(self, key, default=None):
+        raw = self.get(key)
+        return default if raw is None else json.loads(raw)
+
+    def set_json(self, key, value, ttl=None):
+        self.set(key, json.dumps(value, ensure_ascii=False).encode("utf-8"), ttl)
+
+
+class MemoryBackend(StateBackend):
+    """Per-process store capped at max_bytes: expired entries are dropped first,
+    then the least recently used ones."""
+
+    def __init__(self, max_bytes=MEMORY_MAX_BYTES):
+        self._data = OrderedDict() # key -> (bytes or list of bytes, expires)
+        self._size = 0
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _sizeof(value):
+        return sum(map(len, value)) if isinstance(value, list) else len(value)
+
+    def _pop(self, key):
+        item = self._data.pop(key, None)
+        if item is not None: self._size -= self._sizeof(item[0])
+        return item
+
+    def _live(self, key):
+        item = self._data.get(key)
+        if item is None: return None
+        if item[1] and item[1] < time.time():
+            self._pop(key); return None
+        self._data.move_to_end(key)
+        return item
+
+    def _put(self, key, value, ttl):
+        self._pop(key)
+        self._data[key] = (value, time.time() + ttl if ttl else None)
+        self._size += self._sizeof(value)
+        if self._size > self.max_bytes:
+            now = time.time()
+            for k in [k for k, (_, exp) in self._data.items() if exp and exp < now]: self._pop(k)
+            while self._size > self.max_bytes and len(self._data) > 1: self._pop(next(iter(self._data)))
+
+    def get(self, key):
+        with self._lock:
+            item = self._live(key)
+            return None if item is None or isinstance(item[0], list) else item[0]
+
+    def set(self, key, value, ttl=None):
+        with self._lock: self._put(key, value, ttl)
+
+    def delete(self, key):
+        with self._lock: self._pop(key)
+
+    def append(self, key, value, ttl=None):
+        with self._lock:
+            item = self._live(key)
+            self._put(key, (item[0] if item else []) + [value], ttl)
+
+    def items(self, key):
+        with self._lock:
+            item = self._live(key)
+            return list(item[0]) if item else []
+
+
+class SQLiteBackend(StateBackend):
+    """Single-file store; WAL mode lets several local replicas share it."""
+    PURGE_EVERY = 500 # writes between sweeps of expired rows
+
+    def __init__(self, path):
+        self._conn = sqlite3.connect(path, timeout=10, check_same_thread=False, isolation_level=None)
+        self._lock = threading.Lock()
+        self._writes = 0
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS kv (key TEXT PRIMARY KEY, value BLOB NOT NULL, expires REAL)")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS log (seq INTEGER PRIMARY KEY AUTOINCREMENT, key TEXT NOT NULL, value BLOB NOT NULL, expires REAL)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS log_key ON log (key, seq)")
+            self._purge()
+
+    def _purge(self):
+        now = time.time()
+        self._conn.execute("DELETE FROM kv WHERE expires < ?", (now,))
+        self._conn.execute("DELETE FROM log WHERE expires < ?", (now,))
+
+    def _wrote(self):
+        self._writes += 1
+        if self._writes % self.PURGE_EVERY == 0: self._purge()
+
+    def get(self, key):
+        with self._lock:
+            row = self._conn.execute("SELECT value, expires FROM kv WHERE key = ?", (key,)).fetchone()
+            if row is None: return None
+            if row[1] and row[1] < time.time():
+                self._conn.execute("DELETE FROM kv WHERE key = ?", (key,)); return None
+            return bytes(row[0])
+
+    def set(self, key, value, ttl=None):
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO kv (key, value, expires) VALUES (?, ?, ?)",
+                               (key, sqlite3.Binary(value), time.time() + ttl if ttl else None))
+            self._wrote()
+
+    def delete(self, key):
+        with self._lock:
+            self._conn.execute("DELETE FROM kv WHERE key = ?", (key,))
+            self._conn.execute("DELETE FROM log WHERE key = ?", (key,))
+
+    def append(self, key, value, ttl=None):
+        expires = time.time() + ttl if ttl else None
+        with self._lock:
+            self._conn.execute("INSERT INTO log (key, value, expires) VALUES (?, ?, ?)", (key, sqlite3.Binary(value), expires))
+            self._conn.execute("UPDATE log SET expires = ? WHERE key = ?", (expires, key))
+            self._wrote()
+
+    def items(self, key):
+        with self._lock:
+            rows = self._conn.execute("SELECT value FROM log WHERE key = ? AND (expires IS NULL OR expires >= ?) ORDER BY seq",
+                                      (key, time.time())).fetchall()
+        return [bytes(row[0]) for row in rows]
+
+
+class RedisBackend(StateBackend):
+    """Any Redis-protocol server (Redis, Valkey, KeyDB, ...)."""
+
+    def __init__(self, url):
+        import redis # optional dependency, only needed for STATE_BACKEND=redis
+        self._client = redis.Redis.from_url(url or "redis://localhost:6379/0")
+
+    def get(self, key):
+        return self._client.get(key)
+
+    def set(self, key, value, ttl=None):
+        self._client.set(key, value, ex=int(ttl) if ttl else None)
+
+    def delete(self, key):
+        self._client.delete(key)
+
+    def append(self, key, value, ttl=None):
+        pipe = self._client.pipeline()
+        pipe.rpush(key, value)
+        if ttl: pipe.expire(key, int(ttl))
+        pipe.execute()
+
+    def items(self, key):
+        return self._client.lrange(key, 0, -1)
+
+
+@st.cache_resource(show_spinner=False)
+def get_backend():
+    if STATE_BACKEND == "memory": return MemoryBackend()
+    if STATE_BACKEND == "sqlite": return SQLiteBackend(STATE_URL or DEFAULT_SQLITE_PATH)
+    if STATE_BACKEND == "redis": return RedisBackend(STATE_URL)
+    raise ValueError(f"Unknown STATE_BACKEND: {STATE_BACKEND}")
+
+
+# ----------------- Shared Caches -----------------
+def shared_cache(namespace, ttl=None, binary=False):
+    """Second-level cache shared by all replicas, placed under the per-process st.cache_data.
+    Values must be JSON-serializable (or bytes with binary=True) and expire after ttl seconds
+    (default CACHE_TTL). Backend errors fall through to the wrapped function, so a cache
+    outage never breaks a page. With the memory backend there is nothing to share, so the
+    function is returned unwrapped rather than keeping a second copy of st.cache_data."""
+    ttl = ttl or CACHE_TTL
+    def decorator(func):
+        if STATE_BACKEND == "memory": return func
+        @functools.wraps(func)
+        def wrapper(*args):
+            digest = hashlib.sha256(json.dumps(args, ensure_ascii=False, default=str).encode("utf-8")).hexdigest()
+            key = f"cache:{namespace}:{digest}"
+            try:
+                backend = get_backend()
+                with span(f"state.get.{namespace}"):
+                    hit = backend.get(key) if binary else backend.get_json(key)
+                if hit is not None: return hit
+            except Exception as e:
+                print(f"State backend error: {e}"); backend = None
+            value = func(*args)
+            if backend is not None and value is not None:
+                try:
+                    if binary: backend.set(key, value, ttl)
+                    else: backend.set_json(key, value, ttl)
+                except Exception as e:
+                    print(f"State backend error: {e}")
+            return value
+        return wrapper
+    return decorator
+
+
+# ----------------- Durable Conversation History -----------------
+# chat:<sid>:turns is an append-only list of {"messages": [...], "audio": id or None};
+# the answer audio of a turn is stored under chat:<sid>:audio:<id>. Every function here
+# falls back (empty history / not saved) on a backend error, so the chat page keeps
+# working from st.session_state alone.
+def session_id():
+    """Stable id for this user's conversation, kept in the ?sid= URL parameter so a
+    reconnect (to any replica) picks the same history back up. The id is the only key
+    to the chat: anyone with the URL can read and add to it."""
+    sid = st.session_state.get("sid") or st.query_params.get("sid") or uuid.uuid4().hex
+    st.session_state.sid = sid
+    if st.query_params.get("sid") != sid: st.query_params["sid"] = sid
+    return sid
+
+
+def load_history(sid):
+    """Returns (messages, {msg_key: audio_bytes}), msg_key being msg_<1-based position>."""
+    try:
+        backend = get_backend()
+        with span("state.load_history"):
+            messages, audio = [], {}
+            for raw in backend.items(f"chat:{sid}:turns"):
+                turn = json.loads(raw)
+                messages.extend(turn["messages"])
+                data = backend.get(f"chat:{sid}:audio:{turn['audio']}") if turn.get("audio") else None
+                if data: audio[f"msg_{len(messages)}"] = data
+        return messages, audio
+    except Exception as e:
+        print(f"State backend error: {e}")
+        return [], {}
+
+
+def append_turn(sid, messages, audio=None):
+    """Appends one turn (its messages, plus the answer audio if any). Turns are never
+    rewritten, so two tabs on the same ?sid= interleave instead of overwriting each other.
+    Returns False if the backend is unavailable."""
+    try:
+        backend = get_backend()
+        with span("state.append_turn"):
+            turn = {"messages": messages, "audio": uuid.uuid4().hex if audio else None}
+            if audio: backend.set(f"chat:{sid}:audio:{turn['audio']}", audio, HISTORY_TTL)
+            backend.append(f"chat:{sid}:turns", json.dumps(turn, ensure_ascii=False).encode("utf-8"), HISTORY_TTL)
+        return True
+    except Exception as e:
+        print(f"State backend error: {e}")
+        return False
+
+
+def clear_history(sid):
+    try:
+        backend = get_backend()
+        for raw in backend.items(f"chat:{sid}:turns"):
+            audio_id = json.loads(raw).get("audio")
+            if audio_id: backend.delete(f"chat:{sid}:audio:{audio_id}")
+        backend.delete(f"chat:{sid}:turns")
+    except Exception as e:
+        print(f"State backend error: {e}")
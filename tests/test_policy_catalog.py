@@ -0,0 +1,47 @@
+# tests/test_policy_catalog.py
+from policy_catalog import PolicyCatalog, tokenize
+
+
+def _policy(pid, year, subsidy_type, title, kn_title):
+    return {
+        "id": pid, "year": year, "subsidy_type": subsidy_type, "title": title, "amount": "", "free": "", "desc": "",
+        "pdf_url": "", "kn": {"title": kn_title, "desc": "", "free": ""},
+    }
+
+
+POLICIES = [
+    _policy("organic", 2004, "Input subsidy", "Organic Farming Policy", "ಸಾವಯವ ಕೃಷಿ ನೀತಿ"),
+    _policy("integrated", 2020, "Input subsidy", "Integrated Farming Scheme", "ಸಮಗ್ರ ಕೃಷಿ ಯೋಜನೆ"),
+    _policy("machinery", 2023, "Machinery", "Farm Machinery Hubs", "ಕೃಷಿ ಯಂತ್ರೋಪಕರಣ ಕೇಂದ್ರ"),
+]
+
+
+def ids(results):
+    return [p["id"] for p in results]
+
+
+def test_tokenize_keeps_kannada_words_whole():
+    assert tokenize("ಸಾವಯವ ಕೃಷಿ ನೀತಿ") == ["ಸಾವಯವ", "ಕೃಷಿ", "ನೀತಿ"]
+    assert tokenize("Organic-Farming, 2004") == ["organic", "farming", "2004"]
+
+
+def test_search_kannada_prefix():
+    catalog = PolicyCatalog(POLICIES, prebuilt=True)
+    assert ids(catalog.search("ಸಾ")) == ["organic"] # must not match ಸಮಗ್ರ
+    assert ids(catalog.search("ಸಮ")) == ["integrated"]
+    assert ids(catalog.search("ಕೃಷಿ")) == ["organic", "integrated", "machinery"]
+
+
+def test_search_english_prefix_needs_every_token():
+    catalog = PolicyCatalog(POLICIES)
+    assert ids(catalog.search("farm")) == ["organic", "integrated", "machinery"]
+    assert ids(catalog.search("farm mach")) == ["machinery"]
+    assert ids(catalog.search("nothing")) == []
+
+
+def test_search_year_and_type_filters():
+    catalog = PolicyCatalog(POLICIES)
+    assert ids(catalog.search(years=[2004, 2023])) == ["organic", "machinery"]
+    assert ids(catalog.search(subsidy_type="Input subsidy")) == ["organic", "integrated"]
+    assert ids(catalog.search("farming", years=[2020], subsidy_type="Input subsidy")) == ["integrated"]
+    assert catalog.years == [2004, 2020, 2023]
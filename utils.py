@@ -1,11 +1,21 @@
 # utils.py
 import streamlit as st
-from deep_translator import GoogleTranslator
-from gtts import gTTS
+import inspect
 from io import BytesIO
+from concurrent.futures import ThreadPoolExecutor
+import threading
 import base64
 import time
-from langdetect import detect
+import os
+import re
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+try:
+    from streamlit.runtime.scriptrunner_utils.script_run_context import SCRIPT_RUN_CONTEXT_ATTR_NAME as _SCRIPT_CTX_ATTR
+except ImportError: # module layout of older Streamlit releases
+    _SCRIPT_CTX_ATTR = "streamlit_script_run_ctx"
+from metrics import span, mark_cache_miss, current_span, child_spans_of
+from runtime import env, env_int
+from state_store import shared_cache
 
 # ----------------- Session State Init -----------------
 def init_session_state():
@@ -13,69 +23,97 @@ def init_session_state():
         st.session_state.lang = "English"
 
 # ----------------- Global CSS -----------------
+CSS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets", "agribot.css")
+# Behind pwa/nginx.conf set CSS_URL=/agribot.css: the stylesheet is then linked once per page
+# load (and precached) instead of being resent inline on every rerun
+CSS_URL = env("CSS_URL", "")
+
+@st.cache_resource(show_spinner=False)
+def _load_css():
+    """Reads assets/agribot.css once per process and strips comments/whitespace."""
+    with open(CSS_PATH, encoding="utf-8") as f: css = f.read()
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.S)
+    css = re.sub(r"\s+", " ", css)
+    css = re.sub(r"\s*([{};:,>])\s*", r"\1", css)
+    return f"<style>{css.strip()}</style>"
+
 def apply_custom_css():
     init_session_state()
-    st.markdown("""
-    <style>
-    /* Global */
-    .stApp {
-        background: url("https://images.unsplash.com/photo-1500595046743-cd271d6942ee?q=80&w=2074&auto.format&fit=crop") no-repeat center center fixed;
-        background-size: cover;
-        font-family: 'Montserrat', sans-serif;
-    }
-    .stApp::before {
-        content: ""; position: fixed; top: 0; left: 0; width: 100%; height: 100%;
-        background: linear-gradient(135deg, rgba(0,100,0,0.5), rgba(0,0,0,0.3));
-        z-index: -1;
-    }
-    h1, h2, h3, h4, p, li, span, div { 
-        color: #1B5E20 !important; 
-        text-shadow: 0 1px 2px rgba(0,0,0,0.1); 
-    }
-    [data-testid="stSidebar"] { 
-        background-color: rgba(230, 245, 230, 0.8) !important;
-        backdrop-filter: blur(5px);
-    }
-    [data-testid="stChatContainer"] {
-        background-color: rgba(255, 255, 255, 0.9);
-        border-radius: 15px;
-    }
-    .stButton>button{
-        background:linear-gradient(45deg,#2E7D32,#4CAF50);
-        color:white;border:none;border-radius:30px;
-        padding:12px 24px;font-weight:600;font-size:16px;
-        box-shadow:0 3px 10px rgba(0,0,0,0.2);
-    }
-    .stButton>button:hover{
-        transform:translateY(-3px) scale(1.05);
-        box-shadow:0 5px 15px rgba(0,0,0,0.3);
-    }
-    h1{font-size:3rem;text-align:center;animation:fadeInDown .5s;}
-    @keyframes fadeInDown{from{opacity:0;transform:translateY(-20px);}to{opacity:1;transform:translateY(0);}}
-    .streamlit-expanderHeader {
-        background: linear-gradient(45deg, #2E7D32, #4CAF50) !important;
-        color: white !important; border-radius: 15px !important;
-        padding: 12px 20px !important; font-weight: 600 !important;
-        box-shadow: 0 4px 15px rgba(0,0,0,0.2) !important;
-    }
-    .streamlit-expanderContent {
-        background: rgba(255,255,255,0.95) !important;
-        border-radius: 0 0 15px 15px !important;
-        padding: 20px !important; margin-top: -10px !important;
-        box-shadow: 0 8px 25px rgba(0,0,0,0.15) !important;
-    }
-    </style>
-    """, unsafe_allow_html=True)
+    if CSS_URL and _HTML_RUNS_JS: st.html(_CSS_LINK_SCRIPT % {"href": CSS_URL}, unsafe_allow_javascript=True)
+    else: st.markdown(_load_css(), unsafe_allow_html=True)
+
+# ----------------- Same-origin HTML Iframe -----------------
+# components.v1.html is deprecated from the Streamlit releases that ship st.iframe and
+# st.html(unsafe_allow_javascript=...); it is only used on versions older than that.
+_HAS_ST_IFRAME = hasattr(st, "iframe")
+_HTML_RUNS_JS = "unsafe_allow_javascript" in inspect.signature(st.html).parameters
+
+def html_iframe(html, height):
+    """Renders an HTML document in a same-origin iframe with scripts enabled."""
+    if _HAS_ST_IFRAME: return st.iframe(html, height=height)
+    import streamlit.components.v1 as components
+    return components.html(html, height=height)
+
+_CSS_LINK_SCRIPT = """
+    <script>
+    (() => {
+        const doc = window.parent.document;
+        if (doc.querySelector('link[data-agribot-css]')) return;
+        const link = doc.createElement('link');
+        link.rel = 'stylesheet'; link.href = '%(href)s'; link.dataset.agribotCss = '1';
+        doc.head.appendChild(link);
+    })();
+    </script>
+    """
+
+# ----------------- PWA Registration -----------------
+# window.parent is the page itself when the script runs inline (st.html), and the
+# app page when it runs in an iframe, so the same script works both ways.
+_PWA_SCRIPT = """
+    <script>
+    (() => { // scoped: inline scripts share the page's globals across reruns
+        const doc = window.parent.document;
+        if (!doc.querySelector('link[rel="manifest"]')) {
+            const link = doc.createElement('link');
+            link.rel = 'manifest'; link.href = '/manifest.json';
+            doc.head.appendChild(link);
+        }
+        const nav = window.parent.navigator;
+        if ('serviceWorker' in nav) {
+            nav.serviceWorker.register('/service-worker.js', { scope: '/' }).catch((e) => console.warn('SW registration failed', e));
+        }
+    })();
+    </script>
+    """
+
+def register_pwa():
+    """Adds the manifest link and registers /service-worker.js on the app page.
+    st.markdown does not execute <script>, so this uses st.html with JavaScript
+    enabled, or a zero-height component iframe (same origin) on older Streamlit.
+    The files are served from / by pwa/nginx.conf."""
+    if _HTML_RUNS_JS: st.html(_PWA_SCRIPT, unsafe_allow_javascript=True)
+    else: html_iframe(_PWA_SCRIPT, height=0)
 
 # ----------------- Global Translator -----------------
+@shared_cache("translate")
+def _translate_kn(text):
+    from deep_translator import GoogleTranslator # deferred: only needed once Kannada is picked
+    try: return GoogleTranslator(source='en', target='kn').translate(text)
+    except: return None # not cached, retried next time
+
 @st.cache_data
-def t(text, lang="en"):
-    if lang == "English": return text
-    if lang == "Kannada":
-        try: return GoogleTranslator(source='en', target='kn').translate(text)
-        except: return text
+def _t_cached(text, lang):
+    mark_cache_miss()
+    if lang == "Kannada": return _translate_kn(text) or text
     return text
 
+def t(text, lang="en"):
+    if lang != "Kannada": return text
+    with span("translate.ui", cached=True) as s:
+        result = _t_cached(text, lang)
+        s.payload(result)
+        return result
+
 # ----------------- Global Language Toggle -----------------
 def language_toggle():
     init_session_state()
@@ -90,16 +128,110 @@ def language_toggle():
         st.rerun()
 
 # ----------------- (NEW) Global Audio Byte Generator -----------------
+TTS_CHUNK_CHARS = 100 # gTTS request limit; longer text is split by gTTS itself and fetched serially
+TTS_WORKERS = env_int("TTS_WORKERS", 4)
+TTS_MP3_KBPS = 32 # bitrate of gTTS's MP3s, used to estimate how long a chunk plays
+_SENTENCE_END = re.compile(r"(?<=[.!?।॥])\s+|\n+")
+_CLAUSE_END = re.compile(r"(?<=[,;:])\s+|\s+[-–—]\s+")
+
+def _pack(pieces, max_len):
+    """Greedily joins pieces into chunks of at most max_len characters."""
+    chunks, current = [], ""
+    for piece in pieces:
+        if current and len(current) + 1 + len(piece) > max_len:
+            chunks.append(current); current = piece
+        else:
+            current = f"{current} {piece}" if current else piece
+    if current: chunks.append(current)
+    return chunks
+
+def split_tts_text(text: str, max_len: int = TTS_CHUNK_CHARS):
+    """Splits text at sentence, then clause, then word boundaries into chunks gTTS can voice in one request."""
+    text = re.sub(r"[*#_`•]+", " ", text)
+    chunks = []
+    for sentence in filter(None, (s.strip() for s in _SENTENCE_END.split(text))):
+        if len(sentence) <= max_len: chunks.append(sentence); continue
+        for clause in _pack([c.strip() for c in _CLAUSE_END.split(sentence) if c.strip()], max_len):
+            if len(clause) <= max_len: chunks.append(clause); continue
+            words = [w[i:i + max_len] for w in clause.split() for i in range(0, len(w), max_len)]
+            chunks.extend(_pack(words, max_len))
+    # Merge short neighbours back together so we don't pay a round trip per comma
+    return [c for c in _pack(chunks, max_len) if re.search(r"\w", c)]
+
+@st.cache_data(show_spinner=False)
+@shared_cache("tts", binary=True)
+def _tts_chunk(chunk: str):
+    from gtts import gTTS # deferred: pulls in requests/bs4 machinery at import
+    with span("tts.chunk", chars=len(chunk)) as s:
+        audio_bytes_io = BytesIO()
+        gTTS(text=chunk, lang='kn', slow=False).write_to_fp(audio_bytes_io)
+        s.payload(audio_bytes_io.getvalue())
+        return audio_bytes_io.getvalue()
+
+@st.cache_resource(show_spinner=False)
+def _tts_pool():
+    """Process-wide bounded pool, so concurrent users don't multiply requests to the TTS endpoint."""
+    return ThreadPoolExecutor(max_workers=TTS_WORKERS, thread_name_prefix="tts")
+
+def _run_chunk(ctx, parent, chunk):
+    """Pool task: runs _tts_chunk under the caller's ScriptRunContext (st.cache_data and the
+    spans look it up) and under its tts span, then restores the worker thread's previous
+    context so the shared thread does not keep the caller's session alive."""
+    thread = threading.current_thread()
+    previous = getattr(thread, _SCRIPT_CTX_ATTR, None)
+    if ctx is not None: add_script_run_ctx(thread, ctx)
+    try:
+        with child_spans_of(parent): return _tts_chunk(chunk)
+    finally:
+        setattr(thread, _SCRIPT_CTX_ATTR, previous)
+
+def _submit_chunks(text: str):
+    """Starts synthesizing every chunk concurrently; returns the futures in text order."""
+    ctx, parent = get_script_run_ctx(), current_span()
+    return [_tts_pool().submit(_run_chunk, ctx, parent, chunk) for chunk in split_tts_text(text)]
+
 def get_kannada_audio_bytes(text: str):
     """Generates Kannada audio and returns it as bytes."""
     if not text:
         return None
     try:
-        tts = gTTS(text=text, lang='kn', slow=False)
-        audio_bytes_io = BytesIO()
-        tts.write_to_fp(audio_bytes_io)
-        audio_bytes_io.seek(0)
-        return audio_bytes_io.read()
+        with span("tts", chars=len(text)) as s:
+            futures = _submit_chunks(text)
+            try:
+                # MP3 is a frame stream, so the segments concatenate without re-encoding (gTTS does the same)
+                audio = b"".join(f.result() for f in futures)
+            finally:
+                for f in futures: f.cancel()
+            s.payload(audio)
+            return audio or None
+    except Exception as e:
+        print(f"gTTS Error: {e}")
+        st.error(f"TTS Error: {e}")
+        return None
+
+def play_kannada_audio(text: str, autoplay: bool = True):
+    """Plays Kannada audio as soon as the first chunk is ready, then swaps in the full clip
+    resumed at about the point chunk 1 has reached. Returns the full audio bytes, or None."""
+    if not text:
+        return None
+    placeholder = st.empty()
+    try:
+        with span("tts", chars=len(text), progressive=True) as s:
+            futures = _submit_chunks(text)
+            if not futures: return None
+            try:
+                first = futures[0].result()
+                placeholder.audio(first, format="audio/mp3", autoplay=autoplay); shown = time.time()
+                rest = [f.result() for f in futures[1:]]
+            finally:
+                for f in futures: f.cancel()
+            audio = first + b"".join(rest)
+            s.payload(audio)
+            if rest:
+                # The browser cannot report its playback position, so estimate it (never past chunk 1's end)
+                position = min(time.time() - shown, len(first) * 8 / (TTS_MP3_KBPS * 1000))
+                placeholder.audio(audio, format="audio/mp3", autoplay=autoplay, start_time=int(position))
+            return audio
     except Exception as e:
         print(f"gTTS Error: {e}")
         st.error(f"TTS Error: {e}")
@@ -107,16 +239,21 @@ def get_kannada_audio_bytes(text: str):
 
 # ----------------- Translation Helpers -----------------
 def translate_to_english(text):
+    from langdetect import detect
+    from deep_translator import GoogleTranslator
     try:
-        lang = detect(text)
+        with span("langdetect"): lang = detect(text)
         if lang == "en": return text, "en"
-        return GoogleTranslator(source=lang, target="en").translate(text), lang
+        with span("translate.to_en", chars=len(text)):
+            return GoogleTranslator(source=lang, target="en").translate(text), lang
     except:
         return text, "kn" # Assume Kannada if detection fails
 
 def translate_back(text, target_lang):
+    from deep_translator import GoogleTranslator
     try:
         if target_lang == "en": return text
-        return GoogleTranslator(source="en", target=target_lang).translate(text)
+        with span("translate.back", chars=len(text)):
+            return GoogleTranslator(source="en", target=target_lang).translate(text)
     except:
         return text
\ No newline at end of file